@@ -1,10 +1,13 @@
 import os
 import logging
+import click
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
-from sqlalchemy.orm import DeclarativeBase, load_only
+from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Set up logging
@@ -13,6 +16,29 @@ logging.basicConfig(level=logging.DEBUG)
 class Base(DeclarativeBase):
     pass
 
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson; datetimes, dates and UUIDs are encoded in C.
+
+    Naive datetimes are written exactly as datetime.isoformat() writes them (no
+    UTC offset), which is the format the API has always returned. Anything else
+    orjson can't handle natively (e.g. Decimal) falls back to str(), matching
+    Flask's default provider. Keys are sorted unless `sort_keys` is turned off,
+    as with Flask's default provider.
+    """
+
+    sort_keys = True
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize extensions
 db = SQLAlchemy(model_class=Base)
 migrate = Migrate()
@@ -20,14 +46,25 @@ login_manager = LoginManager()
 
 # Create the app
 app = Flask(__name__, static_folder='static', template_folder='templates', static_url_path='/static')
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+if (app.config["SQLALCHEMY_DATABASE_URI"] or "").startswith("sqlite"):
+    # SQLAlchemy already picks the right pool for file vs. in-memory SQLite;
+    # size/timeout/recycle settings don't apply there
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_pre_ping": True,
+    }
+else:
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", "20")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "3600")),
+        "pool_pre_ping": True,
+    }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # Initialize extensions with app
@@ -43,97 +80,105 @@ login_manager.login_message_category = 'info'
 # Proxy fix for Replit deployments
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-# Import model classes
-from models import (
-    User, Card, Order, OrderItem,
-    UserInventory, InventoryItem, TradeOffer, TradeItem,
-    CartSession, CartItem, CreditLedger, IdempotencyKey
+# Only User is needed here (user_loader); routes imports the rest. Importing
+# models still registers every table on db.metadata for create_all().
+from models import User
+
+# Feature flags are read from the environment once at startup
+_FALSY = frozenset({'0', 'false', 'off', 'no', ''})
+
+
+def _truthy(v):
+    if v is None:
+        return True
+    return (v if isinstance(v, str) else str(v)).lower() not in _FALSY
+
+
+_FEAT_FLAGS = dict(
+    feat_credit_issue=_truthy(os.environ.get('FEAT_CREDIT_ISSUE', os.environ.get('feat.credit.issue', '1'))),
+    feat_credit_transfer=_truthy(os.environ.get('FEAT_CREDIT_TRANSFER', os.environ.get('feat.credit.transfer', '1'))),
+    feat_credit_redeem=_truthy(os.environ.get('FEAT_CREDIT_REDEEM', os.environ.get('feat.credit.redeem', '1'))),
 )
 
+
 # Inject feature flags into templates
 @app.context_processor
 def inject_feature_flags():
-    def _truthy(v):
-        if v is None:
-            return True
-        return str(v).lower() not in ('0', 'false', 'off', 'no', '')
-
-    return dict(
-        feat_credit_issue=_truthy(os.environ.get('FEAT_CREDIT_ISSUE', os.environ.get('feat.credit.issue', '1'))),
-        feat_credit_transfer=_truthy(os.environ.get('FEAT_CREDIT_TRANSFER', os.environ.get('feat.credit.transfer', '1'))),
-        feat_credit_redeem=_truthy(os.environ.get('FEAT_CREDIT_REDEEM', os.environ.get('feat.credit.redeem', '1'))),
-    )
+    return _FEAT_FLAGS
 
 # User loader callback
 @login_manager.user_loader
 def load_user(user_id):
     try:
-        return User.query.get(int(user_id))
-    except Exception:
-        # Fallback: select only base columns to avoid errors if new columns not migrated yet
-        try:
-            return (
-                User.query.options(
-                    load_only(
-                        User.id,
-                        User.username,
-                        User.email,
-                        User.password_hash,
-                        User.role,
-                        User.created_at,
-                        User.account_status,
-                    )
-                ).get(int(user_id))
-            )
-        except Exception:
-            return None
-
-# Create tables and seed data
-with app.app_context():
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    # Session.get consults the identity map before issuing a SELECT
+    return db.session.get(User, uid)
+
+
+def init_db():
+    """Create tables, apply the SQLite column helpers and seed default users."""
     db.create_all()
-    # Best-effort: ensure new owner columns exist in SQLite when Alembic isn't run
-    try:
-        from apply_owner_columns import apply_owner_columns as _apply_owner_cols
-        _db_path = getattr(getattr(db, 'engine', None), 'url', None)
-        _db_path = getattr(_db_path, 'database', None)
-        _apply_owner_cols([_db_path] if _db_path else None)
-    except Exception:
-        pass
-    # Best-effort: ensure new card_code column exists when Alembic isn't run
+    # Best-effort: ensure newer columns exist in SQLite when Alembic isn't run.
+    # All helpers share one connection to the database file.
     try:
-        from apply_card_code_column import apply_card_code_column as _apply_card_code
+        from apply_sqlite_migrations import STARTUP_HELPERS, apply_all
         _db_path = getattr(getattr(db, 'engine', None), 'url', None)
         _db_path = getattr(_db_path, 'database', None)
-        _apply_card_code([_db_path] if _db_path else None)
+        if _db_path:
+            apply_all(_db_path, STARTUP_HELPERS)
     except Exception:
         pass
+    # The startup helpers give the legacy is_verified column a default and keep it
+    # in sync, so inserts work while it exists; dropping it is left to the operator
+    if any(c['name'] == 'is_verified' for c in db.inspect(db.engine).get_columns('inventory_items')):
+        logging.getLogger(__name__).warning(
+            "inventory_items.is_verified still exists; run apply_drop_inventory_is_verified.py "
+            "(SQLite) or `flask db upgrade` after taking a backup"
+        )
     # Initialize default users if they don't exist
     from models import initialize_default_users
     initialize_default_users()
-    # Best-effort: ensure new cards.language column exists when Alembic isn't run
-    try:
-        from apply_card_language_column import apply_card_language_column as _apply_card_language
-        _db_path = getattr(getattr(db, 'engine', None), 'url', None)
-        _db_path = getattr(_db_path, 'database', None)
-        _apply_card_language([_db_path] if _db_path else None)
-    except Exception:
-        pass
-    # Best-effort: ensure new cards.card_class column exists when Alembic isn't run
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create tables and seed default users."""
+    init_db()
+    print("Database initialized.")
+
+
+@app.cli.command("prune-idempotency-keys")
+@click.option("--days", default=7, show_default=True, help="Delete keys not seen for this many days.")
+def prune_idempotency_keys_command(days):
+    """Delete stale idempotency keys (run nightly)."""
+    from credit_service import prune_idempotency_keys
+    removed = prune_idempotency_keys(days)
+    db.session.commit()
+    print(f"Removed {removed} idempotency keys.")
+
+
+def _claim_auto_init() -> bool:
+    """Create the instance/.seeded sentinel; only the first process to do so gets True."""
+    os.makedirs(app.instance_path, exist_ok=True)
     try:
-        from apply_card_class_column import apply_card_class_column as _apply_card_class
-        _db_path = getattr(getattr(db, 'engine', None), 'url', None)
-        _db_path = getattr(_db_path, 'database', None)
-        _apply_card_class([_db_path] if _db_path else None)
-    except Exception:
-        pass
-    # Best-effort: ensure order tracking columns exist when Alembic isn't run
+        fd = os.open(os.path.join(app.instance_path, '.seeded'), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.close(fd)
+    return True
+
+
+# Dev convenience: bootstrap on import when explicitly enabled. Otherwise run
+# `flask --app main init-db` once so workers don't re-seed on every start.
+if os.environ.get("LOTUS_TCG_AUTO_INIT") == "1" and _claim_auto_init():
     try:
-        from apply_order_tracking_columns import apply_order_tracking_columns as _apply_order_tracking
-        _db_path = getattr(getattr(db, 'engine', None), 'url', None)
-        _db_path = getattr(_db_path, 'database', None)
-        _apply_order_tracking([_db_path] if _db_path else None)
+        with app.app_context():
+            init_db()
     except Exception:
-        pass
+        os.remove(os.path.join(app.instance_path, '.seeded'))
+        raise
 
 # Import routes after app setup
 import routes
@@ -8,44 +8,38 @@ import os
 import sqlite3
 from typing import Iterable
 
+from migrations._conn import apply_to_each, backfill_pragmas, open_db
+from migrations._ddl import add_column_if_missing, has_nulls
 
-def _add_column_if_missing(cur: sqlite3.Cursor, table: str, column: str, ddl: str) -> bool:
-    cur.execute(f"PRAGMA table_info({table})")
-    existing = {row[1] for row in cur.fetchall()}
-    if column in existing:
-        return False
-    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
-    return True
 
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
+    if conn is None:
+        if not db_path or not os.path.exists(db_path):
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error:
+            return False
 
-def _apply_to_db(db_path: str) -> bool:
-    if not db_path or not os.path.exists(db_path):
-        return False
-    conn = None
+    cur = conn.cursor()
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        added = _add_column_if_missing(
-            cur,
-            'cards',
-            'card_class',
-            "VARCHAR(50) DEFAULT 'General'",
-        )
-        # Backfill NULLs regardless of whether the column was just added
-        cur.execute("UPDATE cards SET card_class = 'General' WHERE card_class IS NULL")
-        conn.commit()
-        return added
+        # The connection context commits on success and rolls back on error
+        with backfill_pragmas(conn), conn:
+            cur.execute("BEGIN IMMEDIATE")
+            add_column_if_missing(
+                cur,
+                'cards',
+                'card_class',
+                "VARCHAR(50) DEFAULT 'General'",
+            )
+            # Backfill NULLs regardless of whether the column was just added,
+            # but skip the full-table UPDATE when there is nothing to fill
+            if has_nulls(cur, 'cards', 'card_class'):
+                cur.execute("UPDATE cards SET card_class = 'General' WHERE card_class IS NULL")
+        return True
     except Exception:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
         return False
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 def apply_card_class_column(db_candidates: Iterable[str] | None = None) -> bool:
@@ -56,13 +50,7 @@ def apply_card_class_column(db_candidates: Iterable[str] | None = None) -> bool:
             os.path.join(base_dir, "instance", "your_database.db"),
             os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
         )
-    any_ok = False
-    for path in db_candidates:
-        if not path:
-            continue
-        ok = _apply_to_db(path)
-        any_ok = any_ok or ok
-    return any_ok
+    return any(apply_to_each(_apply_to_db, db_candidates))
 
 
 if __name__ == "__main__":
@@ -8,40 +8,32 @@ import os
 import sqlite3
 from typing import Iterable
 
+from migrations._conn import apply_to_each, open_db
+from migrations._ddl import add_column_if_missing
 
-def _add_column_if_missing(cur: sqlite3.Cursor, table: str, column: str, ddl: str) -> bool:
-    cur.execute(f"PRAGMA table_info({table})")
-    existing = {row[1] for row in cur.fetchall()}
-    if column in existing:
-        return False
-    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
-    return True
 
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
+    if conn is None:
+        if not db_path or not os.path.exists(db_path):
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error:
+            return False
 
-def _apply_to_db(db_path: str) -> bool:
-    if not db_path or not os.path.exists(db_path):
-        return False
-    conn = None
+    cur = conn.cursor()
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        changed = _add_column_if_missing(cur, 'cards', 'card_code', 'VARCHAR(80)')
-        if changed:
-            # No backfill necessary; leave NULLs as-is
-            pass
-        conn.commit()
+        # The connection context commits on success and rolls back on error
+        with conn:
+            cur.execute("BEGIN IMMEDIATE")
+            changed = add_column_if_missing(cur, 'cards', 'card_code', 'VARCHAR(80)')
+            if changed:
+                # No backfill necessary; leave NULLs as-is
+                pass
         return True
     except Exception:
-        try:
-            conn.rollback()
-        except Exception:
-            pass
         return False
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 def apply_card_code_column(db_candidates: Iterable[str] | None = None) -> bool:
@@ -52,13 +44,7 @@ def apply_card_code_column(db_candidates: Iterable[str] | None = None) -> bool:
             os.path.join(base_dir, "instance", "your_database.db"),
             os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
         )
-    any_ok = False
-    for p in db_candidates:
-        if not p:
-            continue
-        ok = _apply_to_db(p)
-        any_ok = any_ok or ok
-    return any_ok
+    return any(apply_to_each(_apply_to_db, db_candidates))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Manual migration helper to drop inventory_items.is_verified for SQLite when Alembic isn't run.
+Verification now lives in verification_status only. Idempotent and safe to run multiple times.
+Needs SQLite 3.35+ for ALTER TABLE ... DROP COLUMN. The drop cannot be undone, so this is
+never run at app startup; run it (or apply_sqlite_migrations.py --drop-is-verified)
+explicitly after a backup.
+"""
+
+import os
+import sqlite3
+from typing import Iterable
+
+from apply_inventory_is_verified_default import TRIGGERS
+from migrations._conn import apply_to_each, open_db
+from migrations._ddl import existing_columns
+
+# Indexes that referenced is_verified, recreated on verification_status
+INDEXES: tuple[tuple[str, str], ...] = (
+    ("ix_inventory_items_market", "(listed_for_sale, verification_status, quantity)"),
+    ("ix_inventory_items_public", "(is_public, verification_status, card_id)"),
+    ("ix_inventory_items_for_sale",
+     "(card_id) WHERE listed_for_sale AND verification_status = 'verified' AND quantity > 0"),
+)
+
+
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
+    if conn is None:
+        if not db_path or not os.path.exists(db_path):
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error:
+            return False
+
+    if sqlite3.sqlite_version_info < (3, 35, 0):
+        return False
+    cur = conn.cursor()
+    try:
+        # The connection context commits on success and rolls back on error
+        with conn:
+            cur.execute("BEGIN IMMEDIATE")
+            if 'is_verified' not in existing_columns(cur, 'inventory_items'):
+                return True
+            # Items only ever flagged through the legacy boolean keep their verified state
+            cur.execute(
+                "UPDATE inventory_items SET verification_status = 'verified' "
+                "WHERE is_verified AND verification_status <> 'verified'"
+            )
+            # SQLite refuses to drop a column that an index or trigger still references
+            for name, _ in INDEXES:
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+            for name, _ in TRIGGERS:
+                cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cur.execute("ALTER TABLE inventory_items DROP COLUMN is_verified")
+            for name, definition in INDEXES:
+                cur.execute(f"CREATE INDEX {name} ON inventory_items {definition}")
+        return True
+    except Exception:
+        return False
+
+
+def apply_drop_inventory_is_verified(db_candidates: Iterable[str] | None = None) -> bool:
+    base_dir = os.path.dirname(__file__)
+    if db_candidates is None:
+        db_candidates = (
+            os.environ.get("LOTUS_TCG_DB_PATH"),
+            os.path.join(base_dir, "instance", "your_database.db"),
+            os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
+        )
+    return any(apply_to_each(_apply_to_db, db_candidates))
+
+
+if __name__ == "__main__":
+    success = apply_drop_inventory_is_verified()
+    raise SystemExit(0 if success else 1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Manual migration helper to keep the legacy inventory_items.is_verified column writable
+for SQLite until apply_drop_inventory_is_verified removes it.
+
+The model no longer writes is_verified, but older databases still declare it NOT NULL
+without a default, so every new inventory insert would fail. This gives the column a
+DEFAULT 0 (SQLite can't alter a default in place, so the table is rebuilt once) and adds
+triggers that keep it in step with verification_status. Nothing is dropped; idempotent
+and safe to run multiple times.
+"""
+
+import os
+import re
+import sqlite3
+from typing import Iterable
+
+from migrations._conn import apply_to_each, open_db
+
+# Keep is_verified equal to verification_status = 'verified' on every write
+TRIGGERS: tuple[tuple[str, str], ...] = (
+    ("trg_inventory_items_is_verified_ins", "AFTER INSERT ON inventory_items"),
+    ("trg_inventory_items_is_verified_upd", "AFTER UPDATE OF verification_status ON inventory_items"),
+)
+
+# The is_verified column definition up to (and including) its declared type
+_COLUMN_DEF = re.compile(r'''(["`\[]?\bis_verified\b["`\]]?\s+\w+)''', re.IGNORECASE)
+
+
+def _rebuild_with_default(cur: sqlite3.Cursor, create_sql: str) -> None:
+    """Recreate inventory_items from `create_sql` with DEFAULT 0 on is_verified, keeping rows and indexes."""
+    new_sql, count = _COLUMN_DEF.subn(r'\1 DEFAULT 0', create_sql, count=1)
+    if not count:
+        raise ValueError("is_verified column definition not found")
+    new_sql = re.sub(r'\binventory_items\b', 'inventory_items_rebuild', new_sql, count=1)
+    cur.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'inventory_items' "
+        "AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )
+    dependents = [row[0] for row in cur.fetchall()]
+    cur.execute(new_sql)
+    cur.execute("INSERT INTO inventory_items_rebuild SELECT * FROM inventory_items")
+    cur.execute("DROP TABLE inventory_items")
+    cur.execute("ALTER TABLE inventory_items_rebuild RENAME TO inventory_items")
+    for sql in dependents:
+        cur.execute(sql)
+
+
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
+    if conn is None:
+        if not db_path or not os.path.exists(db_path):
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error:
+            return False
+
+    cur = conn.cursor()
+    try:
+        # The connection context commits on success and rolls back on error
+        with conn:
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("PRAGMA table_info(inventory_items)")
+            legacy = next((row for row in cur.fetchall() if row[1] == 'is_verified'), None)
+            if legacy is None:
+                return True
+            if legacy[3] and legacy[4] is None:  # NOT NULL without a default
+                cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'inventory_items'")
+                _rebuild_with_default(cur, cur.fetchone()[0])
+            for name, timing in TRIGGERS:
+                cur.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN "
+                    "UPDATE inventory_items SET is_verified = (NEW.verification_status = 'verified') "
+                    "WHERE id = NEW.id; END"
+                )
+        return True
+    except Exception:
+        return False
+
+
+def apply_inventory_is_verified_default(db_candidates: Iterable[str] | None = None) -> bool:
+    base_dir = os.path.dirname(__file__)
+    if db_candidates is None:
+        db_candidates = (
+            os.environ.get("LOTUS_TCG_DB_PATH"),
+            os.path.join(base_dir, "instance", "your_database.db"),
+            os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
+        )
+    return any(apply_to_each(_apply_to_db, db_candidates))
+
+
+if __name__ == "__main__":
+    success = apply_inventory_is_verified_default()
+    raise SystemExit(0 if success else 1)
@@ -12,73 +12,112 @@ attempts to link user_id via email when possible.
 import os
 import sqlite3
 
+from migrations._conn import apply_to_each, backfill_pragmas, open_db
+from migrations._ddl import existing_columns, has_nulls
+
+# UPDATE ... FROM is available from SQLite 3.33.0
+_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
+def _batched_update(cur: sqlite3.Cursor, stmt: str, chunk: int = 1000) -> None:
+    """Run an ``UPDATE orders ... WHERE ...`` statement over rowid windows.
+
+    `stmt` must already contain a WHERE clause; the rowid range is appended to it.
+    orders.id is a string ("ORD-..."), so the integer rowid is used for windows.
+    """
+    cur.execute("SELECT MIN(rowid), MAX(rowid) FROM orders")
+    lo, hi = cur.fetchone()
+    if lo is None:
+        return
+    for start in range(lo, hi + 1, chunk):
+        cur.execute(stmt + " AND orders.rowid >= ? AND orders.rowid < ?", (start, start + chunk))
+
+
+def _apply(path: str, con: sqlite3.Connection | None = None) -> bool:
+    if con is None:
+        if not os.path.exists(path):
+            print(f"[INFO] DB not found: {path}")
+            return False
+        with open_db(path) as con:
+            return _apply(path, con)
 
-def _apply(path: str) -> bool:
-    if not os.path.exists(path):
-        print(f"[INFO] DB not found: {path}")
-        return False
-    con = sqlite3.connect(path)
     cur = con.cursor()
     try:
         print(f"[INFO] Updating: {path}")
-        cur.execute("PRAGMA table_info(orders)")
-        cols = {r[1] for r in cur.fetchall()}
-
-        # Add email
-        if 'email' not in cols:
-            cur.execute("ALTER TABLE orders ADD COLUMN email VARCHAR(120)")
-            print("  + Added orders.email")
-
-        # Add order_number
-        cur.execute("PRAGMA table_info(orders)")
-        cols = {r[1] for r in cur.fetchall()}
-        if 'order_number' not in cols:
-            cur.execute("ALTER TABLE orders ADD COLUMN order_number VARCHAR(30)")
-            print("  + Added orders.order_number")
-        # Backfill order_number from id
-        cur.execute("UPDATE orders SET order_number = id WHERE order_number IS NULL")
-
-        # Add user_id
-        cur.execute("PRAGMA table_info(orders)")
-        cols = {r[1] for r in cur.fetchall()}
-        if 'user_id' not in cols:
-            cur.execute("ALTER TABLE orders ADD COLUMN user_id INTEGER")
-            print("  + Added orders.user_id")
-
-        # Indexes (ignore errors if they exist)
-        try:
-            cur.execute("CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders(user_id)")
-        except Exception:
-            pass
-        try:
-            cur.execute("CREATE INDEX IF NOT EXISTS ix_orders_order_number ON orders(order_number)")
-        except Exception:
-            pass
-
-        # Attempt to backfill user_id where emails match (if users table exists)
-        try:
-            cur.execute("PRAGMA table_info(users)")
-            ucols = {r[1] for r in cur.fetchall()}
-            if 'email' in ucols and 'id' in ucols:
-                cur.execute(
-                    "UPDATE orders SET user_id = (SELECT id FROM users WHERE users.email = orders.email) "
-                    "WHERE user_id IS NULL AND email IS NOT NULL"
-                )
-        except Exception:
-            pass
-
-        con.commit()
+        # The connection context commits on success and rolls back on error
+        with backfill_pragmas(con), con:
+            cur.execute("BEGIN IMMEDIATE")
+            cols = existing_columns(cur, 'orders')
+
+            # Add email
+            if 'email' not in cols:
+                cur.execute("ALTER TABLE orders ADD COLUMN email VARCHAR(120)")
+                cols.add('email')
+                print("  + Added orders.email")
+
+            # Add order_number
+            if 'order_number' not in cols:
+                cur.execute("ALTER TABLE orders ADD COLUMN order_number VARCHAR(30)")
+                cols.add('order_number')
+                print("  + Added orders.order_number")
+
+            # Add user_id
+            if 'user_id' not in cols:
+                cur.execute("ALTER TABLE orders ADD COLUMN user_id INTEGER")
+                cols.add('user_id')
+                print("  + Added orders.user_id")
+
+            # Indexes first so the backfill WHERE clauses below can use them
+            # (ignore errors if they exist)
+            try:
+                cur.execute("CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders(user_id)")
+            except Exception:
+                pass
+            try:
+                cur.execute("CREATE INDEX IF NOT EXISTS ix_orders_order_number ON orders(order_number)")
+            except Exception:
+                pass
+
+            # Backfill order_number from id
+            if has_nulls(cur, 'orders', 'order_number'):
+                _batched_update(cur, "UPDATE orders SET order_number = id WHERE order_number IS NULL")
+
+            # Attempt to backfill user_id where emails match (if users table exists)
+            try:
+                ucols = existing_columns(cur, 'users')
+                if 'email' in ucols and 'id' in ucols:
+                    # Index the join key so the backfill is an index lookup per order,
+                    # not a users scan per order
+                    try:
+                        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users(email)")
+                    except Exception:
+                        pass
+                    # Temporary partial index covering exactly the rows still to be linked
+                    cur.execute(
+                        "CREATE INDEX IF NOT EXISTS ix_orders_backfill_user_id_null ON orders(email) "
+                        "WHERE user_id IS NULL AND email IS NOT NULL"
+                    )
+                    if _HAS_UPDATE_FROM:
+                        _batched_update(
+                            cur,
+                            "UPDATE orders SET user_id = u.id FROM users u "
+                            "WHERE u.email = orders.email AND orders.user_id IS NULL AND orders.email IS NOT NULL"
+                        )
+                    else:
+                        _batched_update(
+                            cur,
+                            "UPDATE orders SET user_id = (SELECT id FROM users WHERE users.email = orders.email) "
+                            "WHERE user_id IS NULL AND email IS NOT NULL"
+                        )
+                    cur.execute("DROP INDEX IF EXISTS ix_orders_backfill_user_id_null")
+            except Exception:
+                pass
+
         print("[SUCCESS] Orders linking columns ensured and backfilled.")
         return True
     except Exception as e:
         print(f"[ERROR] {e}")
-        try:
-            con.rollback()
-        except Exception:
-            pass
         return False
-    finally:
-        con.close()
 
 
 def main():
@@ -90,11 +129,7 @@ def main():
     override = os.environ.get('LOTUS_TCG_DB_PATH')
     if override:
         candidates = [override]
-    any_ok = False
-    for p in candidates:
-        if _apply(p):
-            any_ok = True
-    if not any_ok:
+    if not any(apply_to_each(_apply, candidates)):
         print("[INFO] No databases updated.")
 
 
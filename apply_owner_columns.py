@@ -11,61 +11,84 @@ import os
 import sqlite3
 from typing import Iterable
 
+from migrations._conn import apply_to_each, backfill_pragmas, open_db
+from migrations._ddl import add_column_if_missing, has_nulls
 
-def _add_column_if_missing(cur: sqlite3.Cursor, table: str, column: str, ddl: str) -> bool:
-    cur.execute(f"PRAGMA table_info({table})")
-    existing_cols = {row[1] for row in cur.fetchall()}
-    if column not in existing_cols:
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
-        return True
-    return False
+# UPDATE ... FROM is available from SQLite 3.33.0
+_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
 
 
-def _apply_to_db(db_path: str) -> bool:
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
     """Apply column additions to a specific SQLite DB file.
 
+    Reuses `conn` when given (see `apply_sqlite_migrations.apply_all`).
     Returns True if DB exists and was processed (columns added or already present).
     """
-    if not db_path or not os.path.exists(db_path):
-        print(f"[INFO] Database not found at: {db_path}")
-        return False
+    if conn is None:
+        if not db_path or not os.path.exists(db_path):
+            print(f"[INFO] Database not found at: {db_path}")
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed applying owner columns to {db_path}: {e}")
+            return False
 
+    cur = conn.cursor()
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
+        # The connection context commits on success and rolls back on error
+        with backfill_pragmas(conn), conn:
+            cur.execute("BEGIN IMMEDIATE")
 
-        any_change = False
+            any_change = False
 
-        # cards.owner VARCHAR(80) DEFAULT 'shop'
-        try:
-            changed = _add_column_if_missing(cur, 'cards', 'owner', "VARCHAR(80)")
-            any_change = any_change or changed
-            # Backfill to 'shop' where NULL
-            cur.execute("UPDATE cards SET owner = 'shop' WHERE owner IS NULL")
-        except Exception as e:
-            print(f"[WARN] Could not modify 'cards' table: {e}")
-
-        # shop_inventory_items.owner VARCHAR(80)
-        try:
-            changed = _add_column_if_missing(cur, 'shop_inventory_items', 'owner', "VARCHAR(80)")
-            any_change = any_change or changed
-            # Backfill from users.username where possible
+            # cards.owner VARCHAR(80) DEFAULT 'shop'
             try:
-                cur.execute(
-                    """
-                    UPDATE shop_inventory_items AS s
-                    SET owner = (
-                        SELECT u.username FROM users u WHERE u.id = s.from_user_id
-                    )
-                    WHERE owner IS NULL
-                    """
-                )
+                changed = add_column_if_missing(cur, 'cards', 'owner', "VARCHAR(80)")
+                any_change = any_change or changed
+                # Backfill to 'shop' where NULL
+                if has_nulls(cur, 'cards', 'owner'):
+                    cur.execute("UPDATE cards SET owner = 'shop' WHERE owner IS NULL")
             except Exception as e:
-                print(f"[WARN] Could not backfill shop_inventory_items.owner: {e}")
-        except Exception as e:
-            print(f"[WARN] Could not modify 'shop_inventory_items' table: {e}")
+                print(f"[WARN] Could not modify 'cards' table: {e}")
+
+            # shop_inventory_items.owner VARCHAR(80)
+            try:
+                changed = add_column_if_missing(cur, 'shop_inventory_items', 'owner', "VARCHAR(80)")
+                any_change = any_change or changed
+                # Backfill from users.username where possible
+                try:
+                    if has_nulls(cur, 'shop_inventory_items', 'owner'):
+                        cur.execute(
+                            "CREATE INDEX IF NOT EXISTS ix_shop_inventory_items_from_user_id "
+                            "ON shop_inventory_items(from_user_id)"
+                        )
+                        if _HAS_UPDATE_FROM:
+                            cur.execute(
+                                """
+                                UPDATE shop_inventory_items
+                                SET owner = u.username
+                                FROM users u
+                                WHERE u.id = shop_inventory_items.from_user_id
+                                  AND shop_inventory_items.owner IS NULL
+                                """
+                            )
+                        else:
+                            cur.execute(
+                                """
+                                UPDATE shop_inventory_items AS s
+                                SET owner = (
+                                    SELECT u.username FROM users u WHERE u.id = s.from_user_id
+                                )
+                                WHERE owner IS NULL
+                                """
+                            )
+                except Exception as e:
+                    print(f"[WARN] Could not backfill shop_inventory_items.owner: {e}")
+            except Exception as e:
+                print(f"[WARN] Could not modify 'shop_inventory_items' table: {e}")
 
-        conn.commit()
         if any_change:
             print(f"[SUCCESS] Owner columns ensured in {db_path}")
         else:
@@ -74,16 +97,7 @@ def _apply_to_db(db_path: str) -> bool:
 
     except Exception as e:
         print(f"[ERROR] Failed applying owner columns to {db_path}: {e}")
-        try:
-            conn.rollback()
-        except Exception:
-            pass
         return False
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 def apply_owner_columns(db_candidates: Iterable[str] | None = None) -> bool:
@@ -100,14 +114,7 @@ def apply_owner_columns(db_candidates: Iterable[str] | None = None) -> bool:
             os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
         )
 
-    any_processed = False
-    for path in db_candidates:
-        if not path:
-            continue
-        ok = _apply_to_db(path)
-        any_processed = any_processed or ok
-
-    return any_processed
+    return any(apply_to_each(_apply_to_db, db_candidates))
 
 
 if __name__ == "__main__":
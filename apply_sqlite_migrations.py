@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Run the manual SQLite migration helpers against a database over one shared connection.
+
+Each `apply_*` module still works standalone; this entry point avoids paying the
+connect/page-cache warm-up once per helper when they all target the same file.
+
+Usage: python apply_sqlite_migrations.py [--drop-is-verified]
+Exits non-zero if any helper fails on any database found.
+"""
+
+import os
+import sqlite3
+import sys
+from typing import Callable, Iterable
+
+import apply_card_class_column
+import apply_card_code_column
+import apply_card_language_column
+import apply_coupon_migration
+import apply_drop_inventory_is_verified
+import apply_inventory_is_verified_default
+import apply_order_tracking_columns
+import apply_orders_linking_migration
+import apply_owner_columns
+import apply_user_contact_fields
+from migrations._conn import open_db
+
+Helper = Callable[[str, sqlite3.Connection], bool]
+
+# Column helpers the app runs on startup when Alembic hasn't been applied: the
+# five the app ran before the helpers shared a connection, plus the non-destructive
+# is_verified default that keeps inventory inserts working until the column is dropped
+STARTUP_HELPERS: tuple[Helper, ...] = (
+    apply_owner_columns._apply_to_db,
+    apply_card_code_column._apply_to_db,
+    apply_card_language_column._apply_to_db,
+    apply_card_class_column._apply_to_db,
+    apply_order_tracking_columns._apply_to_db,
+    apply_inventory_is_verified_default._apply_to_db,
+)
+
+# Everything else only runs when invoked on purpose
+ALL_HELPERS: tuple[Helper, ...] = STARTUP_HELPERS + (
+    apply_user_contact_fields._apply_to_db,
+    apply_coupon_migration._apply_to_db,
+    apply_orders_linking_migration._apply,
+)
+
+# Dropping is_verified is destructive and cannot be undone, so it never happens as a
+# side effect of booting or of a plain run; pass --drop-is-verified after a backup
+DROP_IS_VERIFIED_FLAG = "--drop-is-verified"
+
+
+def apply_all(db_path: str, helpers: Iterable[Helper] = ALL_HELPERS) -> bool:
+    """Run `helpers` in order against `db_path`, sharing a single connection.
+
+    Every helper runs even if an earlier one fails. Helpers return False only on
+    failure, so this returns True only if all of them succeeded.
+    """
+    if not db_path or not os.path.exists(db_path):
+        return False
+    all_ok = True
+    with open_db(db_path) as conn:
+        for helper in helpers:
+            all_ok = helper(db_path, conn) and all_ok
+    return all_ok
+
+
+if __name__ == "__main__":
+    helpers = ALL_HELPERS
+    if DROP_IS_VERIFIED_FLAG in sys.argv[1:]:
+        helpers += (apply_drop_inventory_is_verified._apply_to_db,)
+    base_dir = os.path.dirname(__file__)
+    override = os.environ.get("LOTUS_TCG_DB_PATH")
+    candidates = [override] if override else [
+        os.path.join(base_dir, "instance", "your_database.db"),
+        os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
+    ]
+    paths = [path for path in candidates if os.path.exists(path)]
+    results = [apply_all(path, helpers) for path in paths]
+    raise SystemExit(0 if results and all(results) else 1)
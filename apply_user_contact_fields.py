@@ -11,6 +11,9 @@ import os
 import sqlite3
 from typing import Iterable
 
+from migrations._conn import apply_to_each, open_db
+from migrations._ddl import existing_columns
+
 
 COLS: tuple[tuple[str, str], ...] = (
     ("full_name", "VARCHAR(100)"),
@@ -23,30 +26,38 @@ COLS: tuple[tuple[str, str], ...] = (
 )
 
 
-def _apply_to_db(db_path: str) -> bool:
+def _apply_to_db(db_path: str, conn: sqlite3.Connection | None = None) -> bool:
     """Apply column additions to a specific SQLite DB file.
 
+    Reuses `conn` when given (see `apply_sqlite_migrations.apply_all`).
     Returns True if DB exists and was processed (columns added or already present).
     """
-    if not os.path.exists(db_path):
-        print(f"[INFO] Database not found at: {db_path}")
-        return False
+    if conn is None:
+        if not os.path.exists(db_path):
+            print(f"[INFO] Database not found at: {db_path}")
+            return False
+        try:
+            with open_db(db_path) as conn:
+                return _apply_to_db(db_path, conn)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed applying user contact fields to {db_path}: {e}")
+            return False
 
+    cursor = conn.cursor()
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        # The connection context commits on success and rolls back on error
+        with conn:
+            cursor.execute("BEGIN IMMEDIATE")
 
-        cursor.execute("PRAGMA table_info(users)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
+            existing_cols = existing_columns(cursor, 'users')
 
-        added = []
-        for name, ddl_type in COLS:
-            if name not in existing_cols:
-                cursor.execute(f"ALTER TABLE users ADD COLUMN {name} {ddl_type}")
-                added.append(name)
+            added = []
+            for name, ddl_type in COLS:
+                if name not in existing_cols:
+                    cursor.execute(f"ALTER TABLE users ADD COLUMN {name} {ddl_type}")
+                    added.append(name)
 
         if added:
-            conn.commit()
             print(f"[SUCCESS] Added columns to users: {', '.join(added)} in {db_path}")
         else:
             print(f"[INFO] All contact fields already exist in {db_path}")
@@ -54,16 +65,7 @@ def _apply_to_db(db_path: str) -> bool:
         return True
     except Exception as e:
         print(f"[ERROR] Failed applying user contact fields to {db_path}: {e}")
-        try:
-            conn.rollback()
-        except Exception:
-            pass
         return False
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 def apply_user_contact_fields(db_candidates: Iterable[str] | None = None) -> bool:
@@ -80,14 +82,7 @@ def apply_user_contact_fields(db_candidates: Iterable[str] | None = None) -> boo
             os.path.join(base_dir, "instance", "lotus_tcg_dev.db"),
         )
 
-    any_processed = False
-    for path in db_candidates:
-        if not path:
-            continue
-        ok = _apply_to_db(path)
-        any_processed = any_processed or ok
-
-    return any_processed
+    return any(apply_to_each(_apply_to_db, db_candidates))
 
 
 if __name__ == "__main__":
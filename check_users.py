@@ -7,8 +7,10 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
+from sqlalchemy import func, select
+
 from app import app, db
-from models import User, UserInventory
+from models import User, UserInventory, InventoryItem
 
 def check_existing_users():
     """Check what users exist in the database"""
@@ -16,12 +18,19 @@ def check_existing_users():
         try:
             print("=== Existing Users in Database ===")
 
-            # Get all users
-            users = User.query.all()
+            # Users with their inventory and item count in a single query
+            rows = db.session.execute(
+                select(User, UserInventory, func.count(InventoryItem.id))
+                .outerjoin(UserInventory, UserInventory.user_id == User.id)
+                .outerjoin(InventoryItem, InventoryItem.inventory_id == UserInventory.id)
+                .group_by(User.id, UserInventory.id)
+                .order_by(User.id)
+            ).all()
+            users = [user for user, _, _ in rows]
 
             if not users:
                 print("No users found in database.")
-                print("\nDefault users will be created when the app starts:")
+                print("\nDefault users will be created by `flask --app main init-db`:")
                 print("- Username: 'admin', Password: 'admin123' (Admin role)")
                 print("- Username: 'user', Password: 'user123' (User role)")
                 return
@@ -29,18 +38,15 @@ def check_existing_users():
             print(f"Found {len(users)} user(s):")
             print("-" * 50)
 
-            for user in users:
+            for user, inventory, item_count in rows:
                 print(f"ID: {user.id}")
                 print(f"Username: {user.username}")
                 print(f"Email: {user.email or 'Not set'}")
                 print(f"Role: {user.role}")
                 print(f"Created: {user.created_at}")
 
-                # Check if user has inventory
-                inventory = UserInventory.query.filter_by(user_id=user.id).first()
                 if inventory:
                     print(f"Inventory: {'Public' if inventory.is_public else 'Private'} (ID: {inventory.id})")
-                    item_count = len(inventory.items) if hasattr(inventory, 'items') else 0
                     print(f"Inventory Items: {item_count}")
                 else:
                     print("Inventory: Not created yet")
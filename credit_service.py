@@ -3,9 +3,12 @@ import json
 import time
 import logging
 from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import delete, select, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import OperationalError, DBAPIError
 from sqlalchemy.orm import joinedload
 
@@ -45,15 +48,59 @@ def _require_admin(user: User):
         raise ServiceError('FORBIDDEN', 'Admin privileges required', http=403)
 
 
+def claim_idem(key: str, scope: str, fingerprint: Optional[str] = None) -> Tuple[Optional[int], bool]:
+    """Atomically register `key`; returns (id, inserted).
+
+    One INSERT ... ON CONFLICT (key) DO NOTHING RETURNING id replaces the
+    SELECT-then-INSERT round trips and closes the race between them. Only a
+    replay pays a second statement, which records the sighting in last_seen_at
+    and returns the existing id.
+    """
+    insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    stmt = (insert(IdempotencyKey)
+            .values(key=key, scope=scope, request_fingerprint=fingerprint)
+            .on_conflict_do_nothing(index_elements=['key'])
+            .returning(IdempotencyKey.id))
+    new_id = db.session.execute(stmt).scalar()
+    if new_id is not None:
+        return new_id, True
+    return _touch_idem(key), False
+
+
+def _touch_idem(key: str) -> Optional[int]:
+    """Set last_seen_at on `key` so pruning keeps keys that are still replayed; returns its id."""
+    stmt = update(IdempotencyKey).where(IdempotencyKey.key == key).values(last_seen_at=datetime.utcnow())
+    if db.engine.dialect.update_returning:
+        return db.session.execute(stmt.returning(IdempotencyKey.id)).scalar()
+    db.session.execute(stmt)
+    return db.session.execute(select(IdempotencyKey.id).where(IdempotencyKey.key == key)).scalar()
+
+
 def _check_idempotency(idem_key: Optional[str], scope: str) -> None:
     if not idem_key:
         return
     # Use a separate table to enforce uniqueness across dialects
-    existing = IdempotencyKey.query.filter_by(key=idem_key).first()
-    if existing:
+    _, inserted = claim_idem(idem_key, scope)
+    if not inserted:
+        # _txn rolls the caller's transaction back on this error, which would
+        # undo the touch; roll back now and record the sighting on its own
+        db.session.rollback()
+        _touch_idem(idem_key)
+        db.session.commit()
         raise ServiceError('IDEMPOTENT_REPLAY', 'Duplicate idempotency key', http=409)
-    entry = IdempotencyKey(key=idem_key, scope=scope)
-    db.session.add(entry)
+
+
+def prune_idempotency_keys(max_age_days: int = 7) -> int:
+    """Delete idempotency keys not seen for `max_age_days`; returns the number removed.
+
+    Keeps the key index bounded to the replay window that matters. The caller commits.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    seen = func.coalesce(IdempotencyKey.last_seen_at, IdempotencyKey.created_at)
+    res = db.session.execute(
+        delete(IdempotencyKey).where(seen < cutoff).execution_options(synchronize_session=False)
+    )
+    return res.rowcount or 0
 
 
 @contextmanager
@@ -143,7 +190,7 @@ def _locked_merge_inventory_item(user_id: int, card_id: int) -> InventoryItem:
     )
     if item:
         return item
-    item = InventoryItem(inventory_id=inv.id, card_id=card_id, quantity=0, verification_status='verified', is_verified=True)
+    item = InventoryItem(inventory_id=inv.id, card_id=card_id, quantity=0, verification_status='verified')
     db.session.add(item)
     db.session.flush()
     return item
@@ -235,7 +282,7 @@ def transfer_item(from_user_id: int, to_user_id: int, inventory_item_id: int, qu
             # Block transfer if the item is currently listed for sale to avoid shop inconsistency
             if getattr(src_item, 'listed_for_sale', False):
                 raise ServiceError('ITEM_LISTED', 'Item is currently listed for sale', http=409)
-            if not src_item.is_verified or src_item.verification_status != 'verified':
+            if not src_item.is_verified:
                 raise ServiceError('NOT_VERIFIED', 'Item must be verified before transfer', http=400)
             if src_item.quantity < quantity:
                 raise ServiceError('INSUFFICIENT_QUANTITY', 'Not enough quantity to transfer', http=409)
@@ -244,7 +291,6 @@ def transfer_item(from_user_id: int, to_user_id: int, inventory_item_id: int, qu
             dst_item.quantity += quantity
             # Preserve verification status for the recipient item
             dst_item.verification_status = src_item.verification_status
-            dst_item.is_verified = src_item.is_verified
             # Carry over verification metadata when available
             try:
                 if src_item.is_verified:
@@ -1,24 +1,81 @@
+import itertools
 import threading
-from typing import Dict
+import weakref
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+class _ShardHolder:
+    """Owns one thread's counts; only the thread-local keeps it alive."""
+    __slots__ = ('values', '__weakref__')
+
+    def __init__(self, values: Dict[str, int]):
+        self.values = values
 
 
 class _Counter:
+    """Process-local counters sharded per thread.
+
+    Each thread increments its own dict, so inc() never contends on a lock; the
+    lock is only taken when a thread registers or retires its shard. When a
+    thread exits its thread-local holder is collected and the shard is folded
+    into a base Counter, so the number of live shards tracks live threads.
+    render_prom merges base and shards, which is rare compared to writes.
+    """
+
     def __init__(self):
         self._lock = threading.Lock()
-        self._values: Dict[str, int] = {}
+        self._tls = threading.local()
+        self._ids = itertools.count()
+        # Counts of threads that have exited
+        self._base: Counter[str] = Counter()
+        # Live threads' shards by token
+        self._shards: Dict[int, Dict[str, int]] = {}
+        # Prometheus metric name per counter key, and the sorted key order;
+        # the latter is rebuilt only when a new key appears
+        self._names: Dict[str, str] = {}
+        self._sorted: Optional[List[str]] = None
 
-    def inc(self, name: str, amount: int = 1):
+    def _shard(self) -> Dict[str, int]:
+        shard: Dict[str, int] = {}
+        token = next(self._ids)
         with self._lock:
-            self._values[name] = self._values.get(name, 0) + amount
+            self._shards[token] = shard
+        holder = _ShardHolder(shard)
+        # Runs when the thread exits and its thread-local holder is released
+        weakref.finalize(holder, self._retire, token)
+        self._tls.holder = holder
+        return shard
+
+    def _retire(self, token: int) -> None:
+        with self._lock:
+            shard = self._shards.pop(token, None)
+            if shard:
+                self._base.update(shard)
+
+    def inc(self, name: str, amount: int = 1):
+        try:
+            shard = self._tls.holder.values
+        except AttributeError:
+            shard = self._shard()
+        if name not in self._names:
+            self._names[name] = name.replace('.', '_')
+            self._sorted = None
+        shard[name] = shard.get(name, 0) + amount
 
     def render_prom(self) -> str:
-        lines = []
-        for k, v in sorted(self._values.items()):
-            metric = k.replace('.', '_')
-            lines.append(f"# TYPE {metric} counter")
-            lines.append(f"{metric} {v}")
-        return "\n".join(lines) + "\n"
+        with self._lock:
+            values = Counter(self._base)
+            shards = list(self._shards.values())
+        for shard in shards:
+            values.update(dict(shard))
+        keys = self._sorted
+        if keys is None or len(keys) != len(values):
+            keys = self._sorted = sorted(values)
+        names = self._names
+        return "".join(
+            f"# TYPE {names[k]} counter\n{names[k]} {values[k]}\n" for k in keys
+        ) or "\n"
 
 
 COUNTERS = _Counter()
-
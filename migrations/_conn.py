@@ -0,0 +1,62 @@
+"""
+Shared SQLite connection handling for the manual `apply_*` migration helpers.
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+
+@contextmanager
+def open_db(path: str) -> Iterator[sqlite3.Connection]:
+    """Open `path` in autocommit mode so helpers can manage BEGIN/COMMIT themselves."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# Settings for the bulk backfills. WAL lets readers carry on while the backfill
+# transaction is open, and with synchronous=NORMAL a WAL commit skips the fsync of
+# the main database file: a crash can lose the last commit but cannot corrupt the
+# file. temp_store/cache_size keep sort and index builds in memory.
+_BACKFILL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': '-65536',
+}
+
+
+@contextmanager
+def backfill_pragmas(conn: sqlite3.Connection) -> Iterator[None]:
+    """Apply `_BACKFILL_PRAGMAS` to `conn` and restore the previous values on exit.
+
+    journal_mode is persisted in the database file, so leaving WAL on would
+    permanently convert it; the connection is also shared with the other helpers
+    by `apply_sqlite_migrations.apply_all`. Must be entered outside a transaction.
+    """
+    cur = conn.cursor()
+    prior = {name: cur.execute(f"PRAGMA {name}").fetchone()[0] for name in _BACKFILL_PRAGMAS}
+    for name, value in _BACKFILL_PRAGMAS.items():
+        cur.execute(f"PRAGMA {name}={value}")
+    try:
+        yield
+    finally:
+        for name, value in prior.items():
+            cur.execute(f"PRAGMA {name}={value}")
+
+
+def apply_to_each(apply: Callable[[str], bool], paths: Iterable[str | None]) -> list[bool]:
+    """Run `apply` against each distinct, non-empty DB path concurrently.
+
+    Every call opens its own connection and each SQLite file has its own lock,
+    so separate files can be migrated in parallel.
+    """
+    unique = list(dict.fromkeys(p for p in paths if p))
+    if not unique:
+        return []
+    with ThreadPoolExecutor(max_workers=len(unique)) as ex:
+        return list(ex.map(apply, unique))
@@ -0,0 +1,38 @@
+"""
+Small DDL/DML probes shared by the manual `apply_*` SQLite migration helpers.
+"""
+
+import sqlite3
+
+
+def has_nulls(cur: sqlite3.Cursor, table: str, column: str) -> bool:
+    """Return True if any row in `table` has NULL in `column` (stops at the first hit)."""
+    cur.execute(f"SELECT 1 FROM {table} WHERE {column} IS NULL LIMIT 1")
+    return cur.fetchone() is not None
+
+
+def existing_columns(cur: sqlite3.Cursor, table: str) -> set[str]:
+    """Return the column names of `table` from a single PRAGMA table_info read."""
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cur.fetchall()}
+
+
+def add_column_if_missing(
+    cur: sqlite3.Cursor,
+    table: str,
+    column: str,
+    ddl: str,
+    cols: set[str] | None = None,
+) -> bool:
+    """Add `column` to `table` unless it already exists.
+
+    Pass `cols` (from `existing_columns`) when adding several columns to the same
+    table to skip the PRAGMA read; it is updated in place.
+    """
+    if cols is None:
+        cols = existing_columns(cur, table)
+    if column in cols:
+        return False
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    cols.add(column)
+    return True
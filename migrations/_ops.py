@@ -0,0 +1,88 @@
+"""
+Alembic operation helpers shared by the revisions in `migrations/versions`.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.schema import CreateColumn
+
+from migrations._reflect import index_names, shared_inspector, table_columns
+
+# Dialects that accept several ADD/DROP COLUMN clauses in one ALTER TABLE
+_MULTI_CLAUSE_ALTER = ('postgresql', 'mysql')
+
+
+def add_columns(table: str, *columns: sa.Column, if_not_exists: bool = False) -> None:
+    """Add `columns` to `table` in one ALTER TABLE (one table rebuild on SQLite).
+
+    With `if_not_exists`, columns already on the table are skipped: PostgreSQL
+    checks natively via ADD COLUMN IF NOT EXISTS, other dialects reflect the
+    table once.
+    """
+    bind = op.get_bind()
+    dialect = bind.dialect
+    if if_not_exists and dialect.name != 'postgresql':
+        existing = table_columns(shared_inspector(), table)
+        columns = tuple(c for c in columns if c.name not in existing)
+        if not columns:
+            return
+    if dialect.name in _MULTI_CLAUSE_ALTER:
+        add = 'ADD COLUMN IF NOT EXISTS' if if_not_exists and dialect.name == 'postgresql' else 'ADD COLUMN'
+        clauses = ', '.join(f'{add} {CreateColumn(c).compile(dialect=dialect)}' for c in columns)
+        op.execute(f'ALTER TABLE {table} {clauses}')
+    else:
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.add_column(column)
+
+
+def drop_columns(table: str, *names: str, if_exists: bool = False) -> None:
+    """Drop the named columns from `table` in one ALTER TABLE (one rebuild on SQLite).
+
+    With `if_exists`, names missing from the table are skipped, the same way
+    `add_columns(if_not_exists=True)` skips present ones.
+    """
+    bind = op.get_bind()
+    dialect = bind.dialect
+    if if_exists and dialect.name != 'postgresql':
+        existing = table_columns(shared_inspector(), table)
+        names = tuple(n for n in names if n in existing)
+        if not names:
+            return
+    if dialect.name in _MULTI_CLAUSE_ALTER:
+        drop = 'DROP COLUMN IF EXISTS' if if_exists and dialect.name == 'postgresql' else 'DROP COLUMN'
+        op.execute(f"ALTER TABLE {table} {', '.join(f'{drop} {n}' for n in names)}")
+    else:
+        with op.batch_alter_table(table) as batch_op:
+            for name in names:
+                batch_op.drop_column(name)
+
+
+def create_index(name: str, table: str, columns: list[str], unique: bool = False,
+                 postgresql_where: str | None = None, sqlite_where: str | None = None) -> None:
+    """Create an index if it does not exist yet, without blocking writes on PostgreSQL.
+
+    PostgreSQL builds it with CREATE INDEX CONCURRENTLY IF NOT EXISTS, which
+    cannot run inside a transaction, so the statement goes through an
+    autocommit block (the migration transaction is committed first). Other
+    dialects check the reflected index names and use a plain op.create_index
+    (partial on SQLite when `sqlite_where` is given).
+    """
+    if op.get_bind().dialect.name == 'postgresql':
+        where = f' WHERE {postgresql_where}' if postgresql_where else ''
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)}){where}"
+            )
+    elif name not in index_names(shared_inspector(), table):
+        kw = {'sqlite_where': sa.text(sqlite_where)} if sqlite_where else {}
+        op.create_index(name, table, columns, unique=unique, **kw)
+
+
+def drop_index(name: str, table: str) -> None:
+    """Drop an index if it exists (DROP INDEX IF EXISTS on PostgreSQL, reflection elsewhere)."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    elif name in index_names(shared_inspector(), table):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,68 @@
+"""
+Reflection helpers shared by the idempotent Alembic revisions.
+"""
+
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+_DDL = re.compile(r'\s*(CREATE|ALTER|DROP)\b', re.IGNORECASE)
+
+
+def shared_inspector():
+    """Return one Inspector for the whole migration run.
+
+    The inspector is kept on the migration context, so revisions applied in the
+    same run share its reflection cache. The cache is cleared whenever a
+    CREATE/ALTER/DROP statement runs on the connection, so reflection never
+    outlives a schema change.
+    """
+    ctx = op.get_context()
+    inspector = getattr(ctx, '_shared_inspector', None)
+    if inspector is None:
+        bind = op.get_bind()
+        inspector = sa.inspect(bind)
+
+        def _clear_on_ddl(conn, cursor, statement, parameters, context, executemany):
+            if _DDL.match(statement):
+                inspector.clear_cache()
+
+        sa.event.listen(bind, 'after_cursor_execute', _clear_on_ddl)
+        ctx._shared_inspector = inspector
+    return inspector
+
+
+def table_columns(inspector, table: str) -> frozenset:
+    """Return the column names of `table`, reflected at most once per inspector.
+
+    The set is stored in the inspector's own `info_cache`, so
+    `inspector.clear_cache()` drops it together with the rest of the reflection.
+    A missing table yields an empty set.
+    """
+    key = ('table_columns', table)
+    cols = inspector.info_cache.get(key)
+    if cols is None:
+        try:
+            cols = frozenset(c['name'] for c in inspector.get_columns(table))
+        except Exception:
+            cols = frozenset()
+        inspector.info_cache[key] = cols
+    return cols
+
+
+def has_column(inspector, table: str, column: str) -> bool:
+    return column in table_columns(inspector, table)
+
+
+def index_names(inspector, table: str) -> frozenset:
+    """Return the index names on `table`; cached and missing-table safe like `table_columns`."""
+    key = ('index_names', table)
+    names = inspector.info_cache.get(key)
+    if names is None:
+        try:
+            names = frozenset(ix['name'] for ix in inspector.get_indexes(table))
+        except Exception:
+            names = frozenset()
+        inspector.info_cache[key] = names
+    return names
@@ -97,6 +97,8 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # Batch mode (copy-and-move) is only needed for SQLite's limited ALTER TABLE
+        conf_args["render_as_batch"] = connection.dialect.name == 'sqlite'
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,64 @@
+"""
+Upgrade several databases to an Alembic revision concurrently.
+
+Each database is a separate Alembic run with its own version table and locks,
+so runs are independent of each other; revisions inside one database still
+apply in order. Usage:
+
+    python -m migrations.parallel_runner URL [URL ...] [--workers N] [--revision REV]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upgrade(url: str, revision: str = 'head') -> subprocess.CompletedProcess:
+    """Run `flask db upgrade` for one database in its own process."""
+    env = dict(os.environ, DATABASE_URL=url)
+    return subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'main', 'db', 'upgrade', revision],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+def upgrade_all(urls: Iterable[str], revision: str = 'head', workers: int = 4) -> dict[str, int]:
+    """Upgrade each distinct URL with at most `workers` concurrent runs.
+
+    Returns the exit code per URL; stderr of failed runs is echoed.
+    """
+    unique = list(dict.fromkeys(u for u in urls if u))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique)))) as ex:
+        results = dict(zip(unique, ex.map(lambda u: upgrade(u, revision), unique)))
+    codes = {}
+    for url, proc in results.items():
+        shown = make_url(url).render_as_string(hide_password=True)
+        if proc.returncode:
+            print(f"[ERROR] {shown}\n{proc.stderr}", file=sys.stderr)
+        else:
+            print(f"[OK] {shown}")
+        codes[url] = proc.returncode
+    return codes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', nargs='+', help='database URLs to upgrade')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--revision', default='head')
+    args = parser.parse_args(argv)
+    codes = upgrade_all(args.urls, args.revision, args.workers)
+    return 1 if any(codes.values()) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -7,7 +7,8 @@ Create Date: 2025-09-05 02:10:00.000000
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.engine import reflection
+
+from migrations._reflect import shared_inspector
 
 # revision identifiers, used by Alembic.
 revision = '0001_credit'
@@ -16,33 +17,26 @@ branch_labels = None
 depends_on = None
 
 
-def _has_column(bind, table_name, column_name):
-    insp = reflection.Inspector.from_engine(bind)
-    cols = [c['name'] for c in insp.get_columns(table_name)]
-    return column_name in cols
-
-
-def _table_exists(bind, table_name: str) -> bool:
-    try:
-        return table_name in sa.inspect(bind).get_table_names()
-    except Exception:
-        return False
-
-
-def _index_exists(bind, table_name: str, index_name: str) -> bool:
+def _index_names(inspector, tables: set, table_name: str) -> set:
+    """Names of the indexes on `table_name`, or an empty set if the table is absent"""
+    if table_name not in tables:
+        return set()
     try:
-        idxs = sa.inspect(bind).get_indexes(table_name)
-        return any(ix.get('name') == index_name for ix in idxs)
+        return {ix.get('name') for ix in inspector.get_indexes(table_name)}
     except Exception:
-        return False
+        return set()
 
 
 def upgrade():
     bind = op.get_bind()
     dialect = bind.dialect.name
+    # Reflect once up front through the run-wide inspector
+    inspector = shared_inspector()
+    tables = set(inspector.get_table_names())
+    cards_cols = {c['name'] for c in inspector.get_columns('cards')}
 
     # 1) cards: add currency_code if missing
-    if not _has_column(bind, 'cards', 'currency_code'):
+    if 'currency_code' not in cards_cols:
         op.add_column('cards', sa.Column('currency_code', sa.String(length=10), nullable=False, server_default='VND'))
 
     # 2) inventory_items: add non-negative quantity check (skip if SQLite)
@@ -52,14 +46,9 @@ def upgrade():
         except Exception:
             pass
 
-    # 3) CREDIT unique index on cards (partial index on set_name='CREDIT')
-    if dialect == 'postgresql':
-        op.execute("""
-            CREATE UNIQUE INDEX IF NOT EXISTS ux_credit_card_denom
-            ON cards (set_name, price, foiling, rarity, art_style)
-            WHERE set_name = 'CREDIT';
-        """)
-    else:
+    # 3) CREDIT unique index on cards (partial index on set_name='CREDIT').
+    # On PostgreSQL it is emitted together with the ledger index below.
+    if dialect != 'postgresql':
         # SQLite supports partial indexes; attempt creation
         try:
             op.execute("""
@@ -72,7 +61,8 @@ def upgrade():
             pass
 
     # 4) credit_ledger table (idempotent)
-    if not _table_exists(bind, 'credit_ledger'):
+    ledger_idxs = _index_names(inspector, tables, 'credit_ledger')
+    if 'credit_ledger' not in tables:
         op.create_table(
             'credit_ledger',
             sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
@@ -90,21 +80,32 @@ def upgrade():
             sa.CheckConstraint("direction in ('debit','credit')", name='chk_credit_direction'),
             sa.CheckConstraint("kind in ('issue','redeem','transfer_in','transfer_out','revoke','adjust')", name='chk_credit_kind'),
         )
-    if not _index_exists(bind, 'credit_ledger', 'ix_credit_ledger_user_ts'):
+    if 'ix_credit_ledger_user_ts' not in ledger_idxs:
         try:
             op.create_index('ix_credit_ledger_user_ts', 'credit_ledger', ['user_id', 'entry_ts'], unique=False)
         except Exception:
             pass
 
     if dialect == 'postgresql':
+        # Both partial unique indexes as one multi-statement script: a single
+        # round-trip, inside the transaction env.py already opens for the run
         op.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_credit_card_denom
+            ON cards (set_name, price, foiling, rarity, art_style)
+            WHERE set_name = 'CREDIT';
             CREATE UNIQUE INDEX IF NOT EXISTS ux_credit_ledger_idem
             ON credit_ledger (idempotency_key)
             WHERE idempotency_key IS NOT NULL;
         """)
 
     # 5) idempotency_keys table (idempotent)
-    if not _table_exists(bind, 'idempotency_keys'):
+    if 'idempotency_keys' in tables:
+        try:
+            idem_idxs = inspector.get_indexes('idempotency_keys')
+        except Exception:
+            idem_idxs = []
+    else:
+        idem_idxs = []
         op.create_table(
             'idempotency_keys',
             sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
@@ -115,12 +116,8 @@ def upgrade():
             sa.Column('request_fingerprint', sa.String(length=255), nullable=True),
         )
     # Only create a separate unique index if one on (key) doesn't already exist
-    try:
-        idxs = sa.inspect(bind).get_indexes('idempotency_keys')
-        has_unique_key_idx = any(ix.get('unique') and ix.get('column_names') == ['key'] for ix in idxs)
-    except Exception:
-        has_unique_key_idx = False
-    if not has_unique_key_idx and not _index_exists(bind, 'idempotency_keys', 'ix_idempotency_keys_key'):
+    has_unique_key_idx = any(ix.get('unique') and ix.get('column_names') == ['key'] for ix in idem_idxs)
+    if not has_unique_key_idx and not any(ix.get('name') == 'ix_idempotency_keys_key' for ix in idem_idxs):
         try:
             op.create_index('ix_idempotency_keys_key', 'idempotency_keys', ['key'], unique=True)
         except Exception:
@@ -130,11 +127,13 @@ def upgrade():
 def downgrade():
     bind = op.get_bind()
     dialect = bind.dialect.name
+    inspector = shared_inspector()
+    tables = set(inspector.get_table_names())
 
     # Drop idempotency table (guarded)
-    if _table_exists(bind, 'idempotency_keys'):
+    if 'idempotency_keys' in tables:
         try:
-            if _index_exists(bind, 'idempotency_keys', 'ix_idempotency_keys_key'):
+            if 'ix_idempotency_keys_key' in _index_names(inspector, tables, 'idempotency_keys'):
                 op.drop_index('ix_idempotency_keys_key', table_name='idempotency_keys')
         except Exception:
             pass
@@ -142,20 +141,21 @@ def downgrade():
 
     # Drop ledger (guarded)
     if dialect == 'postgresql':
-        op.execute("DROP INDEX IF EXISTS ux_credit_ledger_idem;")
-    if _table_exists(bind, 'credit_ledger'):
+        op.execute("DROP INDEX IF EXISTS ux_credit_ledger_idem; DROP INDEX IF EXISTS ux_credit_card_denom;")
+    if 'credit_ledger' in tables:
         try:
-            if _index_exists(bind, 'credit_ledger', 'ix_credit_ledger_user_ts'):
+            if 'ix_credit_ledger_user_ts' in _index_names(inspector, tables, 'credit_ledger'):
                 op.drop_index('ix_credit_ledger_user_ts', table_name='credit_ledger')
         except Exception:
             pass
         op.drop_table('credit_ledger')
 
-    # Drop credit unique index
-    try:
-        op.execute("DROP INDEX IF EXISTS ux_credit_card_denom;")
-    except Exception:
-        pass
+    # Drop credit unique index (already dropped above on PostgreSQL)
+    if dialect != 'postgresql':
+        try:
+            op.execute("DROP INDEX IF EXISTS ux_credit_card_denom;")
+        except Exception:
+            pass
 
     # Drop inventory check constraint when supported
     if dialect != 'sqlite':
@@ -8,6 +8,8 @@ Create Date: 2025-09-06
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._reflect import shared_inspector
+
 
 # revision identifiers, used by Alembic.
 revision = 'create_shop_consignment_logs'
@@ -18,8 +20,7 @@ depends_on = None
 
 def upgrade():
     # Be idempotent: Only create the table if it doesn't already exist
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
     if 'shop_consignment_logs' not in inspector.get_table_names():
         op.create_table(
             'shop_consignment_logs',
@@ -31,37 +32,25 @@ def upgrade():
             sa.Column('action', sa.String(length=10), nullable=False),
             sa.Column('created_at', sa.DateTime(), server_default=sa.func.now())
         )
-    # Create indexes if missing; ignore if they already exist
-    try:
+    # Create indexes if missing; existing names come from one reflection pass
+    existing = {ix['name'] for ix in shared_inspector().get_indexes('shop_consignment_logs')}
+    if 'ix_consignment_logs_card' not in existing:
         op.create_index('ix_consignment_logs_card', 'shop_consignment_logs', ['card_id'])
-    except Exception:
-        pass
-    try:
+    if 'ix_consignment_logs_user' not in existing:
         op.create_index('ix_consignment_logs_user', 'shop_consignment_logs', ['from_user_id'])
-    except Exception:
-        pass
-    try:
+    if 'ix_consignment_logs_created' not in existing:
         op.create_index('ix_consignment_logs_created', 'shop_consignment_logs', ['created_at'])
-    except Exception:
-        pass
 
 
 def downgrade():
     # Drop indexes/tables only if they exist
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
     if 'shop_consignment_logs' in inspector.get_table_names():
-        try:
-            op.drop_index('ix_consignment_logs_card')
-        except Exception:
-            pass
-        try:
-            op.drop_index('ix_consignment_logs_user')
-        except Exception:
-            pass
-        try:
-            op.drop_index('ix_consignment_logs_created')
-        except Exception:
-            pass
+        existing = {ix['name'] for ix in inspector.get_indexes('shop_consignment_logs')}
+        if 'ix_consignment_logs_card' in existing:
+            op.drop_index('ix_consignment_logs_card', table_name='shop_consignment_logs')
+        if 'ix_consignment_logs_user' in existing:
+            op.drop_index('ix_consignment_logs_user', table_name='shop_consignment_logs')
+        if 'ix_consignment_logs_created' in existing:
+            op.drop_index('ix_consignment_logs_created', table_name='shop_consignment_logs')
         op.drop_table('shop_consignment_logs')
-
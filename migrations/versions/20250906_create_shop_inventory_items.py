@@ -8,6 +8,8 @@ Create Date: 2025-09-06
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._reflect import shared_inspector
+
 
 # revision identifiers, used by Alembic.
 revision = 'create_shop_inventory_items'
@@ -18,8 +20,7 @@ depends_on = None
 
 def upgrade():
     # Be idempotent: Only create the table if it doesn't already exist
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
 
     if 'shop_inventory_items' not in inspector.get_table_names():
         op.create_table(
@@ -32,29 +33,21 @@ def upgrade():
             sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
             sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
         )
-    # Create indexes if missing; ignore if they already exist
-    try:
+    # Create indexes if missing; existing names come from one reflection pass
+    existing = {ix['name'] for ix in shared_inspector().get_indexes('shop_inventory_items')}
+    if 'ix_shop_items_card' not in existing:
         op.create_index('ix_shop_items_card', 'shop_inventory_items', ['card_id'])
-    except Exception:
-        pass
-    try:
+    if 'ix_shop_items_from_user' not in existing:
         op.create_index('ix_shop_items_from_user', 'shop_inventory_items', ['from_user_id'])
-    except Exception:
-        pass
 
 
 def downgrade():
     # Drop indexes/tables only if they exist
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
     if 'shop_inventory_items' in inspector.get_table_names():
-        try:
-            op.drop_index('ix_shop_items_card')
-        except Exception:
-            pass
-        try:
-            op.drop_index('ix_shop_items_from_user')
-        except Exception:
-            pass
+        existing = {ix['name'] for ix in inspector.get_indexes('shop_inventory_items')}
+        if 'ix_shop_items_card' in existing:
+            op.drop_index('ix_shop_items_card', table_name='shop_inventory_items')
+        if 'ix_shop_items_from_user' in existing:
+            op.drop_index('ix_shop_items_from_user', table_name='shop_inventory_items')
         op.drop_table('shop_inventory_items')
-
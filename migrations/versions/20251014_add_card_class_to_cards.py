@@ -8,6 +8,8 @@ Create Date: 2025-10-14
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._reflect import has_column as _has_column, shared_inspector
+
 
 # revision identifiers, used by Alembic.
 revision = 'add_card_class_column'
@@ -16,17 +18,8 @@ branch_labels = None
 depends_on = None
 
 
-def _has_column(inspector, table: str, column: str) -> bool:
-    try:
-        cols = [c['name'] for c in inspector.get_columns(table)]
-        return column in cols
-    except Exception:
-        return False
-
-
 def upgrade():
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
 
     if not _has_column(inspector, 'cards', 'card_class'):
         op.add_column(
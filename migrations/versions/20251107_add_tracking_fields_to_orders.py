@@ -8,6 +8,8 @@ Create Date: 2025-11-07 22:10:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, drop_columns
+
 
 # revision identifiers, used by Alembic.
 revision = '20251107_tracking'
@@ -17,18 +19,20 @@ depends_on = None
 
 
 def upgrade():
-    # Add tracking-related columns to orders table
-    op.add_column('orders', sa.Column('tracking_number', sa.String(120), nullable=True))
-    op.add_column('orders', sa.Column('tracking_carrier', sa.String(80), nullable=True))
-    op.add_column('orders', sa.Column('tracking_url', sa.String(255), nullable=True))
-    op.add_column('orders', sa.Column('tracking_notes', sa.Text(), nullable=True))
-    op.add_column('orders', sa.Column('shipped_at', sa.DateTime(), nullable=True))
+    # Add tracking-related columns to orders in one ALTER TABLE / one SQLite rebuild.
+    # apply_order_tracking_columns.py may already have added some of them.
+    add_columns(
+        'orders',
+        sa.Column('tracking_number', sa.String(120), nullable=True),
+        sa.Column('tracking_carrier', sa.String(80), nullable=True),
+        sa.Column('tracking_url', sa.String(255), nullable=True),
+        sa.Column('tracking_notes', sa.Text(), nullable=True),
+        sa.Column('shipped_at', sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
 
 
 def downgrade():
-    # Remove tracking-related columns from orders table
-    op.drop_column('orders', 'shipped_at')
-    op.drop_column('orders', 'tracking_notes')
-    op.drop_column('orders', 'tracking_url')
-    op.drop_column('orders', 'tracking_carrier')
-    op.drop_column('orders', 'tracking_number')
+    # Remove tracking-related columns from orders in one ALTER TABLE / one SQLite rebuild
+    drop_columns('orders', 'shipped_at', 'tracking_notes', 'tracking_url', 'tracking_carrier', 'tracking_number',
+                 if_exists=True)
@@ -0,0 +1,36 @@
+"""Add composite index on cards(name, set_name, rarity) for listing pages
+
+Revision ID: 20251108_cards_listing_idx
+Revises: 20251107_tracking
+Create Date: 2025-11-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251108_cards_listing_idx'
+down_revision = '20251107_tracking'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # On PostgreSQL, INCLUDE price/quantity so listing queries can be answered
+    # by an index-only scan; other backends get the plain composite index
+    try:
+        op.create_index(
+            'ix_cards_name_set_rarity', 'cards', ['name', 'set_name', 'rarity'],
+            postgresql_include=['price', 'quantity'],
+        )
+    except Exception:
+        # Be tolerant if the index already exists
+        pass
+
+
+def downgrade():
+    try:
+        op.drop_index('ix_cards_name_set_rarity', table_name='cards')
+    except Exception:
+        pass
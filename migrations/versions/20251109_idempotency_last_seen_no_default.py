@@ -0,0 +1,31 @@
+"""Drop the insert-time default on idempotency_keys.last_seen_at
+
+Revision ID: 20251109_idem_last_seen
+Revises: 20251108_cards_listing_idx
+Create Date: 2025-11-09 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251109_idem_last_seen'
+down_revision = '20251108_cards_listing_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # last_seen_at only means something once a key is seen again; the model's
+    # onupdate sets it then, so inserts no longer need to fill it as well.
+    # SQLite would need a table rebuild to drop a default, so leave it there.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('idempotency_keys', 'last_seen_at', server_default=None)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('idempotency_keys', 'last_seen_at', server_default=sa.func.now())
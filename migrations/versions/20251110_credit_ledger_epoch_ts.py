@@ -0,0 +1,52 @@
+"""Store credit_ledger.entry_ts as integer unix epoch seconds
+
+Revision ID: 20251110_ledger_epoch_ts
+Revises: 20251109_idem_last_seen
+Create Date: 2025-11-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251110_ledger_epoch_ts'
+down_revision = '20251109_idem_last_seen'
+branch_labels = None
+depends_on = None
+
+
+PG_EPOCH_NOW = sa.text("(EXTRACT(epoch FROM now())::bigint)")
+SQLITE_EPOCH_NOW = sa.text("(CAST(strftime('%s', 'now') AS INTEGER))")
+
+
+def upgrade():
+    # ix_credit_ledger_user_ts keeps its columns; it is rebuilt over the int64 values
+    if op.get_bind().dialect.name == 'postgresql':
+        # The now() default can't be cast to bigint, so drop it around the type change
+        op.alter_column('credit_ledger', 'entry_ts', server_default=None)
+        op.alter_column('credit_ledger', 'entry_ts', type_=sa.BigInteger(), existing_nullable=False,
+                        postgresql_using='EXTRACT(epoch FROM entry_ts)::bigint')
+        op.alter_column('credit_ledger', 'entry_ts', server_default=PG_EPOCH_NOW)
+    else:
+        # Convert the 'YYYY-MM-DD HH:MM:SS' text first: the batch rebuild copies rows
+        # with CAST(... AS BIGINT), which would truncate text dates to the year
+        op.execute("UPDATE credit_ledger SET entry_ts = CAST(strftime('%s', entry_ts) AS INTEGER) "
+                   "WHERE typeof(entry_ts) = 'text'")
+        with op.batch_alter_table('credit_ledger') as batch_op:
+            batch_op.alter_column('entry_ts', type_=sa.BigInteger(), existing_nullable=False,
+                                  server_default=SQLITE_EPOCH_NOW)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('credit_ledger', 'entry_ts', server_default=None)
+        op.alter_column('credit_ledger', 'entry_ts', type_=sa.DateTime(), existing_nullable=False,
+                        postgresql_using='to_timestamp(entry_ts)::timestamp')
+        op.alter_column('credit_ledger', 'entry_ts', server_default=sa.func.now())
+    else:
+        with op.batch_alter_table('credit_ledger') as batch_op:
+            batch_op.alter_column('entry_ts', type_=sa.DateTime(), existing_nullable=False,
+                                  server_default=sa.func.now())
+        op.execute("UPDATE credit_ledger SET entry_ts = datetime(entry_ts, 'unixepoch') "
+                   "WHERE typeof(entry_ts) = 'integer'")
@@ -0,0 +1,31 @@
+"""Add partial index for public, verified inventory items
+
+Revision ID: 20251111_inventory_public_idx
+Revises: 20251110_ledger_epoch_ts
+Create Date: 2025-11-11 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '20251111_inventory_public_idx'
+down_revision = '20251110_ledger_epoch_ts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The public inventory/filter queries join cards on card_id for items with
+    # is_public AND is_verified; on PostgreSQL only those rows are indexed
+    create_index(
+        'ix_inventory_items_public', 'inventory_items', ['is_public', 'is_verified', 'card_id'],
+        postgresql_where='is_public AND is_verified',
+    )
+
+
+def downgrade():
+    drop_index('ix_inventory_items_public', 'inventory_items')
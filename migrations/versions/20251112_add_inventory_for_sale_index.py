@@ -0,0 +1,34 @@
+"""Add partial index for inventory items listed for sale
+
+Revision ID: 20251112_inventory_for_sale_idx
+Revises: 20251111_inventory_public_idx
+Create Date: 2025-11-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '20251112_inventory_for_sale_idx'
+down_revision = '20251111_inventory_public_idx'
+branch_labels = None
+depends_on = None
+
+FOR_SALE = 'listed_for_sale AND is_verified AND quantity > 0'
+
+
+def upgrade():
+    # The shop search joins cards on card_id for verified, in-stock items listed
+    # for sale; index only those rows (idx_inventory_items_card_id covers the rest).
+    # Other dialects have no partial indexes and already have the card_id index.
+    dialect = op.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        create_index('ix_inventory_items_for_sale', 'inventory_items', ['card_id'],
+                     postgresql_where=FOR_SALE, sqlite_where=FOR_SALE)
+
+
+def downgrade():
+    drop_index('ix_inventory_items_for_sale', 'inventory_items')
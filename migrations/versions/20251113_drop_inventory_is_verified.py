@@ -0,0 +1,71 @@
+"""Drop inventory_items.is_verified in favour of verification_status
+
+Revision ID: 20251113_drop_inventory_is_verified
+Revises: 20251112_inventory_for_sale_idx
+Create Date: 2025-11-13 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import add_columns, create_index, drop_columns, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '20251113_drop_inventory_is_verified'
+down_revision = '20251112_inventory_for_sale_idx'
+branch_labels = None
+depends_on = None
+
+VERIFIED = "verification_status = 'verified'"
+LEGACY_TRIGGERS = ('trg_inventory_items_is_verified_ins', 'trg_inventory_items_is_verified_upd')
+
+
+def _create_indexes(verified_col, public_where, for_sale_where):
+    dialect = op.get_bind().dialect.name
+    create_index('ix_inventory_items_market', 'inventory_items', ['listed_for_sale', verified_col, 'quantity'])
+    create_index('ix_inventory_items_public', 'inventory_items', ['is_public', verified_col, 'card_id'],
+                 postgresql_where=public_where)
+    if dialect in ('postgresql', 'sqlite'):
+        create_index('ix_inventory_items_for_sale', 'inventory_items', ['card_id'],
+                     postgresql_where=for_sale_where, sqlite_where=for_sale_where)
+
+
+def _drop_indexes():
+    for name in ('ix_inventory_items_market', 'ix_inventory_items_public', 'ix_inventory_items_for_sale'):
+        drop_index(name, 'inventory_items')
+
+
+def upgrade():
+    # Items only ever flagged through the legacy boolean keep their verified state
+    op.execute(
+        "UPDATE inventory_items SET verification_status = 'verified' "
+        f"WHERE is_verified AND NOT ({VERIFIED})"
+    )
+    # The indexes reference is_verified, so they go before the column does
+    _drop_indexes()
+    if op.get_bind().dialect.name == 'sqlite':
+        # Sync triggers added by apply_inventory_is_verified_default
+        for name in LEGACY_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    drop_columns('inventory_items', 'is_verified', if_exists=True)
+    _create_indexes(
+        'verification_status',
+        f"is_public AND {VERIFIED}",
+        f"listed_for_sale AND {VERIFIED} AND quantity > 0",
+    )
+
+
+def downgrade():
+    _drop_indexes()
+    add_columns(
+        'inventory_items',
+        sa.Column('is_verified', sa.Boolean(), nullable=False, server_default=sa.false()),
+        if_not_exists=True,
+    )
+    op.execute(f"UPDATE inventory_items SET is_verified = ({VERIFIED})")
+    _create_indexes(
+        'is_verified',
+        'is_public AND is_verified',
+        'listed_for_sale AND is_verified AND quantity > 0',
+    )
@@ -0,0 +1,87 @@
+"""Store account, verification and order statuses as native enums
+
+Revision ID: 20251114_status_enums
+Revises: 20251113_drop_inventory_is_verified
+Create Date: 2025-11-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251114_status_enums'
+down_revision = '20251113_drop_inventory_is_verified'
+branch_labels = None
+depends_on = None
+
+# (table, column, enum type, values, default)
+ENUMS = (
+    ('users', 'account_status', 'user_account_status', ('active', 'suspended', 'banned'), 'active'),
+    ('inventory_items', 'verification_status', 'inventory_verification_status',
+     ('unverified', 'pending', 'verified'), 'unverified'),
+    ('orders', 'status', 'order_status', ('pending', 'confirmed', 'shipped', 'rejected'), 'pending'),
+)
+
+# PostgreSQL partial indexes whose predicates compare verification_status to a
+# literal; ALTER COLUMN ... TYPE would rewrite them with a text cast that no
+# longer matches the queries, so they are rebuilt around the type change
+PARTIAL_INDEXES = (
+    ('ix_inventory_items_public', ['is_public', 'verification_status', 'card_id'],
+     "is_public AND verification_status = 'verified'"),
+    ('ix_inventory_items_for_sale', ['card_id'],
+     "listed_for_sale AND verification_status = 'verified' AND quantity > 0"),
+)
+
+
+def _rebuild_partial_indexes(change_types):
+    # ALTER COLUMN ... TYPE rewrites the table under an exclusive lock anyway, so
+    # the indexes are rebuilt in the same transaction rather than CONCURRENTLY
+    # (which would commit the revision halfway through)
+    for name, _, _ in PARTIAL_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    change_types()
+    for name, columns, where in PARTIAL_INDEXES:
+        op.create_index(name, 'inventory_items', columns, postgresql_where=sa.text(where))
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        def change_types():
+            for table, column, type_name, values, default in ENUMS:
+                labels = ', '.join(f"'{v}'" for v in values)
+                # CREATE TYPE has no IF NOT EXISTS; tolerate a type left by an earlier attempt
+                op.execute(
+                    f"DO $$ BEGIN CREATE TYPE {type_name} AS ENUM ({labels}); "
+                    "EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+                )
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}"
+                )
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '{default}'")
+        _rebuild_partial_indexes(change_types)
+    elif dialect == 'mysql':
+        for table, column, type_name, values, _ in ENUMS:
+            op.alter_column(table, column, existing_type=sa.String(20), existing_nullable=False,
+                            type_=sa.Enum(*values, name=type_name))
+    # Elsewhere (SQLite) sa.Enum is a VARCHAR, which the columns already are
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        def change_types():
+            for table, column, type_name, _, default in ENUMS:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR(20) USING {column}::text"
+                )
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '{default}'")
+                op.execute(f"DROP TYPE IF EXISTS {type_name}")
+        _rebuild_partial_indexes(change_types)
+    elif dialect == 'mysql':
+        for table, column, type_name, values, _ in ENUMS:
+            op.alter_column(table, column, existing_type=sa.Enum(*values, name=type_name),
+                            existing_nullable=False, type_=sa.String(20))
@@ -0,0 +1,61 @@
+"""Add session lookup and per-cart unique indexes on cart_items
+
+Revision ID: 20251115_cart_items_session_idx
+Revises: 20251114_status_enums
+Create Date: 2025-11-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '20251115_cart_items_session_idx'
+down_revision = '20251114_status_enums'
+branch_labels = None
+depends_on = None
+
+# (index, item column, stock table); admin items are keyed by card_id, user listings by inventory_item_id
+UNIQUE_INDEXES = (
+    ('ux_cart_items_session_admin', 'card_id', 'cards'),
+    ('ux_cart_items_session_user', 'inventory_item_id', 'inventory_items'),
+)
+
+
+def _merge_duplicates(column, stock_table):
+    """Fold repeated rows for the same item in one cart into the oldest row
+
+    The summed quantity is clamped to the item's stock, as _add_to_cart does.
+    """
+    bind = op.get_bind()
+    groups = bind.execute(sa.text(
+        f"SELECT c.session_id, c.{column}, MIN(c.id), SUM(c.quantity), s.quantity FROM cart_items c "
+        f"LEFT JOIN {stock_table} s ON s.id = c.{column} "
+        f"WHERE c.{column} IS NOT NULL GROUP BY c.session_id, c.{column}, s.quantity HAVING COUNT(*) > 1"
+    )).all()
+    for session_id, value, keep_id, total, stock in groups:
+        if stock is not None:
+            total = max(1, min(total, stock))
+        bind.execute(sa.text("UPDATE cart_items SET quantity = :total WHERE id = :keep"),
+                     {'total': total, 'keep': keep_id})
+        bind.execute(sa.text(
+            f"DELETE FROM cart_items WHERE session_id = :sid AND {column} = :value AND id <> :keep"
+        ), {'sid': session_id, 'value': value, 'keep': keep_id})
+
+
+def upgrade():
+    create_index('ix_cart_items_session_lookup', 'cart_items', ['session_id', 'card_id', 'inventory_item_id'])
+    # Partial on PostgreSQL/SQLite; elsewhere NULLs never collide in a unique index
+    for name, column, stock_table in UNIQUE_INDEXES:
+        _merge_duplicates(column, stock_table)
+        where = f'{column} IS NOT NULL'
+        create_index(name, 'cart_items', ['session_id', column], unique=True,
+                     postgresql_where=where, sqlite_where=where)
+
+
+def downgrade():
+    for name, _, _ in UNIQUE_INDEXES:
+        drop_index(name, 'cart_items')
+    drop_index('ix_cart_items_session_lookup', 'cart_items')
@@ -0,0 +1,39 @@
+"""Add timeline indexes for inventory transfer history
+
+Revision ID: 20251116_transfer_log_ts_idx
+Revises: 20251115_cart_items_session_idx
+Create Date: 2025-11-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import create_index, drop_index
+from migrations._reflect import shared_inspector
+
+
+# revision identifiers, used by Alembic.
+revision = '20251116_transfer_log_ts_idx'
+down_revision = '20251115_cart_items_session_idx'
+branch_labels = None
+depends_on = None
+
+TABLE = 'inventory_transfer_logs'
+
+
+def upgrade():
+    # The table comes from db.create_all(); nothing to index before it exists
+    if TABLE not in shared_inspector().get_table_names():
+        return
+    create_index('ix_inventory_transfer_logs_from_user_ts', TABLE, ['from_user_id', 'created_at'])
+    create_index('ix_inventory_transfer_logs_created', TABLE, ['created_at'])
+    # The composite's leading column covers every from_user_id lookup
+    drop_index('ix_inventory_transfer_logs_from_user_id', TABLE)
+
+
+def downgrade():
+    if TABLE not in shared_inspector().get_table_names():
+        return
+    create_index('ix_inventory_transfer_logs_from_user_id', TABLE, ['from_user_id'])
+    drop_index('ix_inventory_transfer_logs_created', TABLE)
+    drop_index('ix_inventory_transfer_logs_from_user_ts', TABLE)
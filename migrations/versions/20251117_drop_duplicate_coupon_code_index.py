@@ -0,0 +1,35 @@
+"""Drop the non-unique coupons.code index duplicating the unique constraint
+
+Revision ID: 20251117_coupon_code_idx
+Revises: 20251116_transfer_log_ts_idx
+Create Date: 2025-11-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._ops import create_index, drop_index
+from migrations._reflect import shared_inspector
+
+
+# revision identifiers, used by Alembic.
+revision = '20251117_coupon_code_idx'
+down_revision = '20251116_transfer_log_ts_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Coupon lookups by code are served by the UNIQUE(code) constraint's index.
+    # Databases built by create_all() named that unique index ix_coupons_code
+    # themselves, so only a non-unique one is dropped.
+    for ix in shared_inspector().get_indexes('coupons'):
+        if ix['name'] == 'ix_coupons_code' and not ix['unique']:
+            drop_index('ix_coupons_code', 'coupons')
+
+
+def downgrade():
+    # Only restore the duplicate where upgrade removed it; create_all() databases
+    # still have their unique ix_coupons_code
+    if not any(ix['name'] == 'ix_coupons_code' for ix in shared_inspector().get_indexes('coupons')):
+        create_index('ix_coupons_code', 'coupons', ['code'])
@@ -8,6 +8,9 @@ Create Date: 2025-09-03 00:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import create_index
+from migrations._reflect import shared_inspector, table_columns
+
 
 # revision identifiers, used by Alembic.
 revision = '210a2ab185a6'
@@ -16,57 +19,53 @@ branch_labels = None
 depends_on = None
 
 
-def _has_column(inspector, table: str, column: str) -> bool:
-    try:
-        cols = [c['name'] for c in inspector.get_columns(table)]
-        return column in cols
-    except Exception:
-        return False
-
-
 def upgrade():
-    bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    inspector = shared_inspector()
+    # Reflect the users columns and indexes once and gate every DDL below on these sets
+    existing = table_columns(inspector, 'users')
+    existing_idx = {ix['name'] for ix in inspector.get_indexes('users')}
 
     # last_login
-    if not _has_column(inspector, 'users', 'last_login'):
+    if 'last_login' not in existing:
         op.add_column('users', sa.Column('last_login', sa.DateTime(), nullable=True))
 
     # account_status
-    if not _has_column(inspector, 'users', 'account_status'):
+    if 'account_status' not in existing:
         op.add_column(
             'users',
             sa.Column('account_status', sa.String(length=20), nullable=False, server_default='active'),
         )
 
     # suspension_reason
-    if not _has_column(inspector, 'users', 'suspension_reason'):
+    if 'suspension_reason' not in existing:
         op.add_column('users', sa.Column('suspension_reason', sa.Text(), nullable=True))
 
     # suspension_expires
-    if not _has_column(inspector, 'users', 'suspension_expires'):
+    if 'suspension_expires' not in existing:
         op.add_column('users', sa.Column('suspension_expires', sa.DateTime(), nullable=True))
 
     # password reset fields
-    if not _has_column(inspector, 'users', 'password_reset_token'):
+    if 'password_reset_token' not in existing:
         op.add_column('users', sa.Column('password_reset_token', sa.String(length=256), nullable=True))
 
-    if not _has_column(inspector, 'users', 'password_reset_expires'):
+    if 'password_reset_expires' not in existing:
         op.add_column('users', sa.Column('password_reset_expires', sa.DateTime(), nullable=True))
 
     # two-factor fields
-    if not _has_column(inspector, 'users', 'two_factor_enabled'):
+    if 'two_factor_enabled' not in existing:
         op.add_column(
             'users',
-            sa.Column('two_factor_enabled', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+            sa.Column('two_factor_enabled', sa.Boolean(), nullable=False, server_default=sa.false()),
         )
 
-    if not _has_column(inspector, 'users', 'two_factor_secret'):
+    if 'two_factor_secret' not in existing:
         op.add_column('users', sa.Column('two_factor_secret', sa.String(length=256), nullable=True))
 
-    # Optional: add helpful indexes if they don't exist (idempotent via raw SQL)
-    op.execute("CREATE INDEX IF NOT EXISTS idx_users_last_login ON users (last_login)")
-    op.execute("CREATE INDEX IF NOT EXISTS idx_users_account_status ON users (account_status)")
+    # Optional: add helpful indexes if they don't exist
+    if 'idx_users_last_login' not in existing_idx:
+        create_index('idx_users_last_login', 'users', ['last_login'])
+    if 'idx_users_account_status' not in existing_idx:
+        create_index('idx_users_account_status', 'users', ['account_status'])
 
 
 def downgrade():
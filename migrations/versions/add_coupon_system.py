@@ -8,6 +8,8 @@ Create Date: 2025-09-03 07:02:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, create_index, drop_columns
+
 
 # revision identifiers, used by Alembic.
 revision = 'add_coupon_system'
@@ -18,8 +20,10 @@ depends_on = None
 
 def upgrade():
     # Create coupons table
+    # Identity caches 50 ids per session on PostgreSQL instead of one nextval()
+    # per insert; dialects without identity columns ignore it
     op.create_table('coupons',
-        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.Integer(), sa.Identity(start=1, cycle=False, cache=50), nullable=False),
         sa.Column('code', sa.String(length=20), nullable=False),
         sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=False),
         sa.Column('description', sa.String(length=255), nullable=True),
@@ -34,17 +38,21 @@ def upgrade():
         sa.UniqueConstraint('code')
     )
 
-    # Add coupon fields to orders table
-    op.add_column('orders', sa.Column('coupon_id', sa.Integer(), nullable=True))
-    op.add_column('orders', sa.Column('coupon_code', sa.String(length=20), nullable=True))
-    op.add_column('orders', sa.Column('discount_amount', sa.Numeric(precision=10, scale=2), nullable=False))
-    op.add_column('orders', sa.Column('discounted_total', sa.Numeric(precision=10, scale=2), nullable=True))
+    # Add coupon fields to orders table in one ALTER TABLE / one SQLite rebuild.
+    # discount_amount needs a default to be NOT NULL on a populated table.
+    add_columns(
+        'orders',
+        sa.Column('coupon_id', sa.Integer(), nullable=True),
+        sa.Column('coupon_code', sa.String(length=20), nullable=True),
+        sa.Column('discount_amount', sa.Numeric(precision=10, scale=2), nullable=False, server_default='0'),
+        sa.Column('discounted_total', sa.Numeric(precision=10, scale=2), nullable=True),
+    )
 
     # Create foreign key constraint
     op.create_foreign_key('fk_orders_coupon_id', 'orders', 'coupons', ['coupon_id'], ['id'])
 
     # Create index on coupon code for faster lookups
-    op.create_index('ix_coupons_code', 'coupons', ['code'])
+    create_index('ix_coupons_code', 'coupons', ['code'])
 
 
 def downgrade():
@@ -52,10 +60,7 @@ def downgrade():
     op.drop_constraint('fk_orders_coupon_id', 'orders', type_='foreignkey')
 
     # Remove added columns from orders table
-    op.drop_column('orders', 'discounted_total')
-    op.drop_column('orders', 'discount_amount')
-    op.drop_column('orders', 'coupon_code')
-    op.drop_column('orders', 'coupon_id')
+    drop_columns('orders', 'discounted_total', 'discount_amount', 'coupon_code', 'coupon_id')
 
     # Drop index
     op.drop_index('ix_coupons_code', table_name='coupons')
@@ -8,6 +8,8 @@ Create Date: 2025-09-05 03:40:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, drop_columns
+
 
 # revision identifiers, used by Alembic.
 revision = 'add_order_email'
@@ -17,16 +19,9 @@ depends_on = None
 
 
 def upgrade():
-    try:
-        op.add_column('orders', sa.Column('email', sa.String(length=120), nullable=True))
-    except Exception:
-        # For sqlite or if column already exists
-        pass
+    add_columns('orders', sa.Column('email', sa.String(length=120), nullable=True), if_not_exists=True)
 
 
 def downgrade():
-    try:
-        op.drop_column('orders', 'email')
-    except Exception:
-        pass
+    drop_columns('orders', 'email', if_exists=True)
 
@@ -8,35 +8,48 @@ Create Date: 2025-09-05 21:35:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, create_index, drop_columns, drop_index
+
 
 revision = 'add_order_number_to_orders'
 down_revision = 'add_user_contact_fields'
 branch_labels = None
 depends_on = None
 
+BACKFILL_BATCH = 5000
+
 
 def upgrade():
+    conn = op.get_bind()
+    is_pg = conn.dialect.name == 'postgresql'
+    add_columns('orders', sa.Column('order_number', sa.String(length=30), nullable=True), if_not_exists=True)
+    if is_pg:
+        # Temporary partial index over exactly the rows still to backfill
+        op.execute('CREATE INDEX IF NOT EXISTS ix_orders_order_number_null ON orders (id) WHERE order_number IS NULL')
+    else:
+        create_index('ix_orders_order_number', 'orders', ['order_number'])
+
+    # Backfill in bounded batches so no single statement touches every row;
+    # the index above lets each batch find its NULL rows without a full scan
+    batch = sa.text(
+        'UPDATE orders SET order_number = id WHERE id IN '
+        '(SELECT id FROM orders WHERE order_number IS NULL LIMIT :b)'
+    )
     try:
-        op.add_column('orders', sa.Column('order_number', sa.String(length=30), nullable=True))
-    except Exception:
-        pass
-    try:
-        op.create_index('ix_orders_order_number', 'orders', ['order_number'], unique=False)
-    except Exception:
-        pass
-    try:
-        op.execute('UPDATE orders SET order_number = id WHERE order_number IS NULL')
+        while conn.execute(batch, {'b': BACKFILL_BATCH}).rowcount >= BACKFILL_BATCH:
+            pass
     except Exception:
         pass
 
+    if is_pg:
+        op.execute('DROP INDEX IF EXISTS ix_orders_order_number_null')
+        # Lookups are by order_number = ?, which never matches NULL, so leave
+        # NULL rows out of the index
+        create_index('ix_orders_order_number', 'orders', ['order_number'],
+                     postgresql_where='order_number IS NOT NULL')
+
 
 def downgrade():
-    try:
-        op.drop_index('ix_orders_order_number', table_name='orders')
-    except Exception:
-        pass
-    try:
-        op.drop_column('orders', 'order_number')
-    except Exception:
-        pass
+    drop_index('ix_orders_order_number', 'orders')
+    drop_columns('orders', 'order_number', if_exists=True)
 
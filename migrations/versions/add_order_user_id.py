@@ -8,6 +8,8 @@ Create Date: 2025-09-05 22:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, create_index, drop_columns, drop_index
+
 
 revision = 'add_order_user_id'
 down_revision = 'add_order_number_to_orders'
@@ -16,21 +18,12 @@ depends_on = None
 
 
 def upgrade():
-    try:
-        op.add_column('orders', sa.Column('user_id', sa.Integer(), nullable=True))
-        op.create_index('ix_orders_user_id', 'orders', ['user_id'], unique=False)
-        # Note: SQLite can't easily add FK constraints after table creation. We keep it nullable and indexed.
-    except Exception:
-        pass
+    add_columns('orders', sa.Column('user_id', sa.Integer(), nullable=True), if_not_exists=True)
+    create_index('ix_orders_user_id', 'orders', ['user_id'])
+    # Note: SQLite can't easily add FK constraints after table creation. We keep it nullable and indexed.
 
 
 def downgrade():
-    try:
-        op.drop_index('ix_orders_user_id', table_name='orders')
-    except Exception:
-        pass
-    try:
-        op.drop_column('orders', 'user_id')
-    except Exception:
-        pass
+    drop_index('ix_orders_user_id', 'orders')
+    drop_columns('orders', 'user_id', if_exists=True)
 
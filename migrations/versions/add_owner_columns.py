@@ -1,60 +1,76 @@
 """Add owner columns to cards and shop_inventory_items
 
 Revision ID: add_owner_columns
-Revises: create_shop_consignment_logs
+Revises: create_shop_consignment_logs, add_order_user_id
 Create Date: 2025-09-22
 
 """
+import sqlite3
+
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import drop_columns
+from migrations._reflect import has_column as _has_column, shared_inspector
+
 
 # revision identifiers, used by Alembic.
 revision = 'add_owner_columns'
-down_revision = '487dc01e2a2d'
+# Merge point for the shop-inventory and order-linking branches
+down_revision = ('create_shop_consignment_logs', 'add_order_user_id')
 branch_labels = None
 depends_on = None
 
 
+# UPDATE ... FROM is available from SQLite 3.33.0
+_SQLITE_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
 def upgrade():
-    # Add owner column to cards (default 'shop')
-    try:
+    inspector = shared_inspector()
+
+    # Add owner column to cards (default 'shop'). ADD COLUMN with a constant
+    # default already fills existing rows (metadata-only on PostgreSQL 11+), so
+    # only a pre-existing column can hold NULLs that need backfilling.
+    if not _has_column(inspector, 'cards', 'owner'):
         op.add_column('cards', sa.Column('owner', sa.String(length=80), nullable=True, server_default='shop'))
-    except Exception:
-        pass
-    # Backfill existing rows to 'shop' where null
-    try:
+    else:
         op.execute("UPDATE cards SET owner = 'shop' WHERE owner IS NULL")
-    except Exception:
-        pass
 
     # Add owner column to shop_inventory_items
-    try:
+    if not _has_column(inspector, 'shop_inventory_items', 'owner'):
         op.add_column('shop_inventory_items', sa.Column('owner', sa.String(length=80), nullable=True))
-    except Exception:
-        pass
-    # Backfill from users.username where possible
-    try:
-        op.execute(
-            """
+    # Backfill from users.username where possible, as one set-based join
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql' or (dialect == 'sqlite' and _SQLITE_HAS_UPDATE_FROM):
+        backfill = """
+            UPDATE shop_inventory_items AS s
+            SET owner = u.username
+            FROM users u
+            WHERE u.id = s.from_user_id AND s.owner IS NULL
+        """
+    elif dialect == 'mysql':
+        backfill = """
+            UPDATE shop_inventory_items s
+            JOIN users u ON u.id = s.from_user_id
+            SET s.owner = u.username
+            WHERE s.owner IS NULL
+        """
+    else:
+        backfill = """
             UPDATE shop_inventory_items AS s
             SET owner = (
                 SELECT u.username FROM users u WHERE u.id = s.from_user_id
             )
             WHERE owner IS NULL
-            """
-        )
+        """
+    try:
+        op.execute(backfill)
     except Exception:
         pass
 
 
 def downgrade():
     # Drop added columns
-    try:
-        op.drop_column('shop_inventory_items', 'owner')
-    except Exception:
-        pass
-    try:
-        op.drop_column('cards', 'owner')
-    except Exception:
-        pass
+    drop_columns('shop_inventory_items', 'owner', if_exists=True)
+    drop_columns('cards', 'owner', if_exists=True)
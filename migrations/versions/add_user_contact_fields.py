@@ -8,6 +8,9 @@ Create Date: 2025-09-05 03:55:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._ops import add_columns, drop_columns
+from migrations._reflect import shared_inspector, table_columns
+
 
 revision = 'add_user_contact_fields'
 down_revision = 'add_order_email'
@@ -15,28 +18,27 @@ branch_labels = None
 depends_on = None
 
 
+COLS = [
+    ('full_name', sa.String(length=100)),
+    ('phone_number', sa.String(length=20)),
+    ('address_line', sa.Text()),
+    ('address_city', sa.String(length=100)),
+    ('address_province', sa.String(length=100)),
+    ('address_postal_code', sa.String(length=20)),
+    ('address_country', sa.String(length=100)),
+]
+
+
 def upgrade():
-    cols = [
-        ('full_name', sa.String(length=100)),
-        ('phone_number', sa.String(length=20)),
-        ('address_line', sa.Text()),
-        ('address_city', sa.String(length=100)),
-        ('address_province', sa.String(length=100)),
-        ('address_postal_code', sa.String(length=20)),
-        ('address_country', sa.String(length=100)),
-    ]
-    for name, coltype in cols:
-        try:
-            op.add_column('users', sa.Column(name, coltype, nullable=True))
-        except Exception:
-            pass
+    # Add whichever columns are missing in one ALTER TABLE / one SQLite rebuild
+    existing = table_columns(shared_inspector(), 'users')
+    missing = [sa.Column(name, coltype, nullable=True) for name, coltype in COLS if name not in existing]
+    if missing:
+        add_columns('users', *missing)
 
 
 def downgrade():
-    for name in [
-        'full_name','phone_number','address_line','address_city','address_province','address_postal_code','address_country']:
-        try:
-            op.drop_column('users', name)
-        except Exception:
-            pass
-
+    existing = table_columns(shared_inspector(), 'users')
+    present = [name for name, _ in COLS if name in existing]
+    if present:
+        drop_columns('users', *present)
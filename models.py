@@ -1,17 +1,85 @@
 """
 SQLAlchemy models for The Lotus TCG
+
+Collection relationships added for reporting (e.g. User.orders,
+User.credit_ledger) are declared with lazy='raise', so touching one that
+wasn't loaded fails loudly instead of silently issuing a query per row.
+List views that need them load them explicitly, e.g.
+``select(User).options(selectinload(User.credit_ledger), raiseload('*'))``.
 """
+import hmac
+import logging
 import os
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import g, has_request_context
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import String, Integer, Numeric, DateTime, Text, func, ForeignKey, BigInteger, CheckConstraint, Index
-from sqlalchemy.orm import relationship
+from werkzeug.security import check_password_hash
+from sqlalchemy import String, Integer, Numeric, DateTime, Text, func, ForeignKey, BigInteger, CheckConstraint, Enum, Identity, Index, column, event, insert, table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import configure_mappers, relationship
 from sqlalchemy.orm import Mapped, mapped_column
 
 # Import db from app - will be available after app initialization
 from app import db
 
+logger = logging.getLogger(__name__)
+
+
+# argon2id cost; raise these as far as login latency allows. Hashes made with
+# other parameters are upgraded on the next successful login (check_needs_rehash)
+_PH = PasswordHasher(
+    time_cost=int(os.environ.get('ARGON2_TIME_COST', '3')),
+    memory_cost=int(os.environ.get('ARGON2_MEMORY_COST', '65536')),
+    parallelism=int(os.environ.get('ARGON2_PARALLELISM', '4')),
+)
+
+_ADMIN_ROLES = frozenset({'admin', 'super_admin'})
+
+# Status columns are native enums on PostgreSQL/MySQL (VARCHAR elsewhere)
+_ACCOUNT_STATUS = Enum('active', 'suspended', 'banned', name='user_account_status')
+_VERIFICATION_STATUS = Enum('unverified', 'pending', 'verified', name='inventory_verification_status')
+_ORDER_STATUS = Enum('pending', 'confirmed', 'shipped', 'rejected', name='order_status')
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with argon2id"""
+    return _PH.hash(password)
+
+
+@lru_cache(maxsize=4)
+def _default_password_hash(password: str) -> str:
+    """Hash for a seeded default password, computed once per process.
+
+    Test suites reseed fresh databases repeatedly; reusing the hash skips the
+    deliberately slow KDF each time.
+    """
+    return hash_password(password)
+
+
+def _safe_eq(a: str, b: str) -> bool:
+    """Constant-time string comparison for secrets such as tokens and keys"""
+    return hmac.compare_digest(a.encode(), b.encode())
+
+
+def _column_values(obj, from_dict: itemgetter, from_attrs: attrgetter) -> tuple:
+    """Read several column values off a mapped instance for to_dict().
+
+    Loaded columns live in the instance __dict__, which is far cheaper to read
+    than the instrumented attributes. If any is missing (expired, deferred or
+    never set) fall back to attribute access, which loads it.
+    """
+    try:
+        return from_dict(obj.__dict__)
+    except KeyError:
+        return from_attrs(obj)
+
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
@@ -21,17 +89,17 @@ class User(UserMixin, db.Model):
     email: Mapped[str] = mapped_column(String(120), unique=True, nullable=True)
     password_hash: Mapped[str] = mapped_column(String(256), nullable=False)
     role: Mapped[str] = mapped_column(String(20), nullable=False, default='user')
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     # Enhanced user management fields
     last_login: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    account_status: Mapped[str] = mapped_column(String(20), nullable=False, default='active')  # active, suspended, banned
-    suspension_reason: Mapped[str] = mapped_column(Text, nullable=True)
+    account_status: Mapped[str] = mapped_column(_ACCOUNT_STATUS, nullable=False, default='active')  # active, suspended, banned
+    suspension_reason: Mapped[str] = mapped_column(Text, nullable=True, deferred=True)
     suspension_expires: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     password_reset_token: Mapped[str] = mapped_column(String(256), nullable=True)
     password_reset_expires: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     two_factor_enabled: Mapped[bool] = mapped_column(db.Boolean, default=False, nullable=False)
-    two_factor_secret: Mapped[str] = mapped_column(String(256), nullable=True)
+    two_factor_secret: Mapped[str] = mapped_column(String(256), nullable=True, deferred=True)
     # Contact and address fields
     full_name: Mapped[str] = mapped_column(String(100), nullable=True)
     phone_number: Mapped[str] = mapped_column(String(20), nullable=True)
@@ -43,14 +111,46 @@ class User(UserMixin, db.Model):
     # Temporarily comment out these columns until database is updated
     # login_attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     # locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    inventory = relationship('UserInventory', back_populates='user')
+    # Reporting collections; load with selectinload (see module docstring)
+    orders = relationship('Order', back_populates='user', lazy='raise', passive_deletes=True)
+    credit_ledger = relationship('CreditLedger', back_populates='user', foreign_keys='CreditLedger.user_id',
+                                 lazy='raise', passive_deletes=True)
     
     def check_password(self, password: str) -> bool:
-        """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check if provided password matches hash.
+
+        Legacy werkzeug hashes are upgraded to argon2 in place on a successful
+        check; the caller's commit persists the new hash.
+        """
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.password_hash = _PH.hash(password)
+            return True
+        try:
+            _PH.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if _PH.check_needs_rehash(self.password_hash):
+            self.password_hash = _PH.hash(password)
+        return True
+
+    def verify_reset_token(self, token: str) -> bool:
+        """Check a password reset token in constant time; expired or missing tokens never match.
+
+        Secrets such as the reset token or two-factor secret must not be compared with ==.
+        """
+        if not self.password_reset_token or not token:
+            return False
+        if not self.password_reset_expires or datetime.utcnow() >= self.password_reset_expires:
+            return False
+        return _safe_eq(self.password_reset_token, token)
     
     def is_admin(self) -> bool:
         """Check if user has admin role"""
-        return self.role in ['admin', 'super_admin']
+        return self.role in _ADMIN_ROLES
 
     def is_super_admin(self) -> bool:
         """Check if user has super admin role"""
@@ -69,19 +169,25 @@ class User(UserMixin, db.Model):
         return self.account_status == 'banned'
 
     def can_login(self) -> bool:
-        """Check if user can login"""
-        if self.is_banned():
-            return False
+        """Check if user can login; read-only, an expired suspension counts as lifted"""
         if self.is_suspended() and self.suspension_expires:
-            if datetime.utcnow() < self.suspension_expires:
-                return False
-            else:
-                # Suspension expired, reactivate account
-                self.account_status = 'active'
-                self.suspension_reason = None
-                self.suspension_expires = None
+            return datetime.utcnow() >= self.suspension_expires
         return self.is_active()
 
+    def reap_expired_suspension(self) -> bool:
+        """Reactivate the account if its suspension has expired.
+
+        Returns True if the account was reactivated; the caller's commit persists it.
+        """
+        if not (self.is_suspended() and self.suspension_expires):
+            return False
+        if datetime.utcnow() < self.suspension_expires:
+            return False
+        self.account_status = 'active'
+        self.suspension_reason = None
+        self.suspension_expires = None
+        return True
+
     def update_last_login(self):
         """Update last login timestamp"""
         self.last_login = datetime.utcnow()
@@ -117,51 +223,57 @@ class User(UserMixin, db.Model):
         # The admin can manually review and re-verify items if needed
 
     def _sync_inventory_verification_status(self, new_status, admin_user=None, reason=None):
-        """Synchronize verification status of all user's inventory items"""
+        """Synchronize verification status of all user's inventory items.
+
+        Runs entirely in the database: one INSERT ... SELECT writes the audit logs
+        for the items that change, then one UPDATE changes them. No item rows are
+        fetched, so memory use does not grow with the inventory size.
+        """
         try:
-            # Get user's inventory
-            user_inventory = UserInventory.query.filter_by(user_id=self.id).first()
-            if not user_inventory:
+            # Items are matched through a subquery on the user's inventories, so no
+            # UserInventory or InventoryItem objects are loaded
+            inventory_ids = db.select(UserInventory.id).where(UserInventory.user_id == self.id)
+            stale = (InventoryItem.inventory_id.in_(inventory_ids), InventoryItem.verification_status != new_status)
+            now = datetime.utcnow()
+
+            if admin_user:
+                # Audit rows first, while the items still carry their old status
+                status = InventoryItem.verification_status
+                rows = db.select(
+                    InventoryItem.id,
+                    db.literal(admin_user.id),
+                    db.literal('bulk_status_change'),
+                    db.case((status == 'verified', db.true()), (status == 'unverified', db.false()), else_=db.null()),
+                    db.literal(_verification_status_bool(new_status), db.Boolean),
+                    db.literal(f"User account status change: {reason}"),
+                    db.literal(now, DateTime),
+                ).where(*stale)
+                db.session.execute(
+                    db.insert(VerificationAuditLog).from_select(
+                        ['inventory_item_id', 'admin_id', 'action', 'previous_status', 'new_status', 'notes', 'created_at'],
+                        rows,
+                    )
+                )
+
+            values = {'verification_status': new_status, 'updated_at': now}
+            if new_status == 'verified':
+                values.update(verified_at=now, verified_by=admin_user.id if admin_user else None)
+            elif new_status == 'unverified':
+                values.update(verified_at=None, verified_by=None)
+            # The commit below expires loaded items, so skip the session sync (which
+            # would fetch the matched ids back)
+            result = db.session.execute(
+                db.update(InventoryItem).where(*stale).values(**values),
+                execution_options={'synchronize_session': False},
+            )
+            if not result.rowcount:
                 return
 
-            # Update all inventory items
-            updated_count = 0
-            for item in user_inventory.items:
-                if item.verification_status != new_status:
-                    old_item_status = item.verification_status
-                    item.verification_status = new_status
-                    item.is_verified = (new_status == 'verified')
-
-                    if new_status == 'verified':
-                        item.verified_at = datetime.utcnow()
-                        item.verified_by = admin_user.id if admin_user else None
-                    elif new_status == 'unverified':
-                        item.verified_at = None
-                        item.verified_by = None
-
-                    item.updated_at = datetime.utcnow()
-
-                    # Create verification audit log
-                    if admin_user:
-                        VerificationAuditLog.create_log(
-                            inventory_item_id=item.id,
-                            admin_id=admin_user.id,
-                            action='bulk_status_change',
-                            previous_status=old_item_status,
-                            new_status=new_status,
-                            notes=f"User account status change: {reason}",
-                            ip_address=None,
-                            user_agent=None
-                        )
-                    updated_count += 1
-
-            if updated_count > 0:
-                db.session.commit()
-                print(f"Synchronized {updated_count} inventory items for user {self.username}")
+            db.session.commit()
 
         except Exception as e:
             db.session.rollback()
-            print(f"Error synchronizing inventory verification status: {e}")
+            logger.error(f"Error synchronizing inventory verification status: {e}")
 
     def record_login_attempt(self, success: bool = True):
         """Record login attempt"""
@@ -190,16 +302,18 @@ class User(UserMixin, db.Model):
 
     def to_dict(self):
         """Convert user to dictionary for API responses"""
+        # Datetimes stay datetime objects here and in the other to_dict methods;
+        # the app's orjson provider encodes them when the dict is jsonified
         return {
             'id': self.id,
             'username': self.username,
             'email': self.email,
             'role': self.role,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'created_at': self.created_at,
+            'last_login': self.last_login,
             'account_status': self.account_status,
             'suspension_reason': self.suspension_reason,
-            'suspension_expires': self.suspension_expires.isoformat() if self.suspension_expires else None,
+            'suspension_expires': self.suspension_expires,
             'two_factor_enabled': self.two_factor_enabled
         }
 
@@ -208,6 +322,15 @@ class User(UserMixin, db.Model):
         return f"User: {self.username} ({self.role}) - {self.account_status}"
 
 
+_CARD_KEYS = (
+    'id', 'name', 'set_name', 'rarity', 'condition', 'language', 'price', 'quantity',
+    'description', 'image_url', 'card_code', 'foiling', 'art_style', 'card_class',
+    'is_deleted', 'created_at', 'updated_at',
+)
+_card_from_dict = itemgetter(*_CARD_KEYS)
+_card_from_attrs = attrgetter(*_CARD_KEYS)
+
+
 class Card(db.Model):
     __tablename__ = "cards"
     
@@ -218,7 +341,7 @@ class Card(db.Model):
     condition: Mapped[str] = mapped_column(String(20), nullable=False, default='Near Mint')
     # Default language for this catalog card entry (used in catalog/home/orders when not a user item)
     language: Mapped[str] = mapped_column(String(20), nullable=True, default='English')
-    price: Mapped[float] = mapped_column(Numeric(18, 2), nullable=False, default=0.0)
+    price: Mapped[float] = mapped_column(Numeric(18, 2, asdecimal=False), nullable=False, default=0.0)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     image_url: Mapped[str] = mapped_column(String(500), nullable=True)
@@ -230,8 +353,11 @@ class Card(db.Model):
     # Owner of the catalog item: 'shop' for admin-managed stock
     owner: Mapped[str] = mapped_column(String(80), nullable=True, default='shop')
     is_deleted: Mapped[bool] = mapped_column(db.Boolean, nullable=False, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
+
+    order_items = relationship('OrderItem', back_populates='card')
+
     __table_args__ = (
         # Prevent duplicate CREDIT denominations across canonical attributes we track
         Index(
@@ -239,34 +365,30 @@ class Card(db.Model):
             'set_name', 'price', 'foiling', 'rarity', 'art_style', unique=True,
             postgresql_where=db.text("set_name = 'CREDIT'")
         ),
+        # Covering index for listing pages (INCLUDE is PostgreSQL-only)
+        Index(
+            'ix_cards_name_set_rarity', 'name', 'set_name', 'rarity',
+            postgresql_include=['price', 'quantity'],
+        ),
     )
     
     def to_dict(self):
         """Convert card to dictionary for templates"""
+        (id_, name, set_name, rarity, condition, language, price, quantity, description, image_url,
+         card_code, foiling, art_style, card_class, is_deleted, created_at, updated_at
+         ) = _column_values(self, _card_from_dict, _card_from_attrs)
         return {
-            'id': str(self.id),
-            'name': self.name,
-            'set_name': self.set_name,
-            'rarity': self.rarity,
-            'condition': self.condition,
-            'language': self.language or 'English',
-            'price': float(self.price),
-            'quantity': self.quantity,
-            'description': self.description or '',
-            'image_url': self.image_url or '',
-            'card_code': self.card_code or '',
-            'foiling': self.foiling,
-            'art_style': self.art_style,
-            'card_class': self.card_class or 'General',
-            'is_deleted': self.is_deleted,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'id': str(id_), 'name': name, 'set_name': set_name, 'rarity': rarity,
+            'condition': condition, 'language': language or 'English', 'price': price,
+            'quantity': quantity, 'description': description or '', 'image_url': image_url or '',
+            'card_code': card_code or '', 'foiling': foiling, 'art_style': art_style,
+            'card_class': card_class or 'General', 'is_deleted': is_deleted,
+            'created_at': created_at, 'updated_at': updated_at,
         }
 
     def soft_delete(self):
-        """Mark card as deleted without removing from database"""
+        """Mark card as deleted without removing from database (updated_at is bumped by onupdate)"""
         self.is_deleted = True
-        self.updated_at = func.now()
     
     def __str__(self) -> str:
         """String representation of card"""
@@ -277,6 +399,17 @@ class Card(db.Model):
         return self.set_name == 'CREDIT'
 
 
+_ORDER_KEYS = (
+    'id', 'customer_name', 'contact_number', 'facebook_details', 'shipment_method',
+    'pickup_location', 'status', 'total_amount', 'discount_amount', 'discounted_total',
+    'coupon_code', 'shipping_address', 'shipping_city', 'shipping_province',
+    'shipping_postal_code', 'shipping_country', 'tracking_number', 'tracking_carrier',
+    'tracking_url', 'tracking_notes', 'shipped_at', 'created_at', 'updated_at',
+)
+_order_from_dict = itemgetter(*_ORDER_KEYS)
+_order_from_attrs = attrgetter(*_ORDER_KEYS)
+
+
 class Order(db.Model):
     __tablename__ = "orders"
 
@@ -290,8 +423,8 @@ class Order(db.Model):
     facebook_details: Mapped[str] = mapped_column(Text, nullable=True)
     shipment_method: Mapped[str] = mapped_column(String(20), nullable=False)  # 'shipping' or 'pickup'
     pickup_location: Mapped[str] = mapped_column(String(50), nullable=True)  # 'Iron Hammer' or 'Floating Dojo'
-    status: Mapped[str] = mapped_column(String(20), nullable=False, default='pending')
-    total_amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    status: Mapped[str] = mapped_column(_ORDER_STATUS, nullable=False, default='pending')
+    total_amount: Mapped[float] = mapped_column(Numeric(10, 2, asdecimal=False), nullable=False)
 
     # Shipping address fields (required when shipment_method is 'shipping')
     shipping_address: Mapped[str] = mapped_column(Text, nullable=True)
@@ -305,54 +438,42 @@ class Order(db.Model):
     tracking_notes: Mapped[str] = mapped_column(Text, nullable=True)
     shipped_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Coupon-related fields
     coupon_id: Mapped[int] = mapped_column(Integer, ForeignKey('coupons.id'), nullable=True)
     coupon_code: Mapped[str] = mapped_column(String(20), nullable=True)  # Store coupon code at time of order
-    discount_amount: Mapped[float] = mapped_column(Numeric(10, 2), default=0.0, nullable=False)  # Discount applied
-    discounted_total: Mapped[float] = mapped_column(Numeric(10, 2), nullable=True)  # Final total after discount
+    discount_amount: Mapped[float] = mapped_column(Numeric(10, 2, asdecimal=False), default=0.0, nullable=False)  # Discount applied
+    discounted_total: Mapped[float] = mapped_column(Numeric(10, 2, asdecimal=False), nullable=True)  # Final total after discount
 
     # Relationship to order items
-    items = relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
-    user = relationship('User')
+    # Load explicitly with selectinload(Order.items); implicit lazy loads raise
+    items = relationship('OrderItem', back_populates='order', lazy='raise', cascade='all, delete-orphan')
+    user = relationship('User', back_populates='orders')
     coupon = relationship('Coupon')  # Relationship to applied coupon
 
     def to_dict(self):
         """Convert order to dictionary for templates"""
-        return {
-            'id': self.id,
-            'customer_name': self.customer_name,
-            'contact_number': self.contact_number,
-            'facebook_details': self.facebook_details,
-            'shipment_method': self.shipment_method,
-            'pickup_location': self.pickup_location,
-            'status': self.status,
-            'total_amount': float(self.total_amount),
-            'discount_amount': float(self.discount_amount),
-            'discounted_total': float(self.discounted_total) if self.discounted_total else float(self.total_amount),
-            'coupon_code': self.coupon_code,
-            'coupon': self.coupon.to_dict() if self.coupon else None,
-            'shipping_address': self.shipping_address,
-            'shipping_city': self.shipping_city,
-            'shipping_province': self.shipping_province,
-            'shipping_postal_code': self.shipping_postal_code,
-            'shipping_country': self.shipping_country,
-            'tracking_number': self.tracking_number,
-            'tracking_carrier': self.tracking_carrier,
-            'tracking_url': self.tracking_url,
-            'tracking_notes': self.tracking_notes,
-            'shipped_at': self.shipped_at.isoformat() if self.shipped_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        d = dict(zip(_ORDER_KEYS, _column_values(self, _order_from_dict, _order_from_attrs)))
+        coupon = self.coupon
+        d['discounted_total'] = d['discounted_total'] or d['total_amount']
+        d['coupon'] = coupon.to_dict() if coupon else None
+        return d
 
     def __str__(self) -> str:
         """String representation of order"""
         return f"Order: {self.id} - {self.customer_name} - {self.total_amount} VND"
 
 
+_ORDER_ITEM_KEYS = (
+    'id', 'order_id', 'card_id', 'inventory_item_id', 'seller_user_id', 'quantity',
+    'unit_price', 'total_price',
+)
+_order_item_from_dict = itemgetter(*_ORDER_ITEM_KEYS)
+_order_item_from_attrs = attrgetter(*_ORDER_ITEM_KEYS)
+
+
 class OrderItem(db.Model):
     __tablename__ = "order_items"
 
@@ -364,27 +485,21 @@ class OrderItem(db.Model):
     # Seller user id for user-listed items (None for store/admin items)
     seller_user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
-    unit_price: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
-    total_price: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    unit_price: Mapped[float] = mapped_column(Numeric(10, 2, asdecimal=False), nullable=False)
+    total_price: Mapped[float] = mapped_column(Numeric(10, 2, asdecimal=False), nullable=False)
 
+    order = relationship('Order', back_populates='items')
     # Relationship to card
-    card = relationship('Card', backref='order_items')
+    card = relationship('Card', back_populates='order_items')
     inventory_item = relationship('InventoryItem', foreign_keys=[inventory_item_id])
     seller = relationship('User', foreign_keys=[seller_user_id])
 
     def to_dict(self):
         """Convert order item to dictionary for templates"""
-        return {
-            'id': self.id,
-            'order_id': self.order_id,
-            'card_id': self.card_id,
-            'inventory_item_id': self.inventory_item_id,
-            'seller_user_id': self.seller_user_id,
-            'quantity': self.quantity,
-            'unit_price': float(self.unit_price),
-            'total_price': float(self.total_price),
-            'card': self.card.to_dict() if self.card else None
-        }
+        d = dict(zip(_ORDER_ITEM_KEYS, _column_values(self, _order_item_from_dict, _order_item_from_attrs)))
+        card = self.card
+        d['card'] = card.to_dict() if card else None
+        return d
 
     def __str__(self) -> str:
         """String representation of order item"""
@@ -398,24 +513,96 @@ class UserInventory(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     is_public: Mapped[bool] = mapped_column(db.Boolean, default=False, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
-    user = relationship("User", backref="inventory")
-    items = relationship("InventoryItem", back_populates="inventory", cascade="all, delete-orphan")
+    user = relationship("User", back_populates="inventory")
+    # Load explicitly with selectinload(UserInventory.items); implicit lazy loads raise
+    items = relationship("InventoryItem", back_populates="inventory", cascade="all, delete-orphan", lazy='raise')
 
     def __str__(self) -> str:
         """String representation of user inventory"""
         return f"UserInventory: {self.user.username} ({'Public' if self.is_public else 'Private'})"
 
 
+_INVENTORY_ITEM_KEYS = (
+    'id', 'inventory_id', 'card_id', 'quantity', 'condition', 'verification_status',
+    'added_at', 'verified_at', 'updated_at', 'notes', 'grade', 'language',
+    'foil_type', 'is_mint', 'is_public', 'listed_for_sale',
+)
+_inventory_item_from_dict = itemgetter(*_INVENTORY_ITEM_KEYS)
+_inventory_item_from_attrs = attrgetter(*_INVENTORY_ITEM_KEYS)
+# Card columns InventoryItem.to_dict shows alongside the item
+_ITEM_CARD_KEYS = ('name', 'set_name', 'rarity', 'price', 'image_url')
+_item_card_from_dict = itemgetter(*_ITEM_CARD_KEYS)
+_item_card_from_attrs = attrgetter(*_ITEM_CARD_KEYS)
+
+_VERIFICATION_STATUS_DISPLAY = {
+    'unverified': 'Unverified',
+    'pending': 'Pending Review',
+    'verified': 'Verified',
+}
+
+
+class _FieldError(ValueError):
+    """Validation failure whose message is reported as-is"""
+
+
+def _validate_quantity(value):
+    if value is None:
+        return None
+    value = int(value)
+    if value <= 0:
+        raise _FieldError('Quantity must be greater than 0')
+    if value > 1000:
+        raise _FieldError('Quantity cannot exceed 1000')
+    return value
+
+
+def _max_length(limit, message):
+    def validate(value):
+        if value and len(str(value)) > limit:
+            raise _FieldError(message)
+        return value
+    return validate
+
+
+def _as_is(value):
+    return value
+
+
+# Fields InventoryItem.update_from_dict accepts, mapped to their validator
+_ITEM_FIELD_VALIDATORS = {
+    'quantity': _validate_quantity,
+    'condition': _as_is,
+    'notes': _max_length(1000, 'Notes cannot exceed 1000 characters'),
+    'grade': _max_length(20, 'Grade cannot exceed 20 characters'),
+    'language': _as_is,
+    'foil_type': _as_is,
+    'is_mint': bool,
+    'is_public': _as_is,
+}
+
+
 class InventoryItem(db.Model):
     """Individual item in a user's inventory"""
     __tablename__ = "inventory_items"
     __table_args__ = (
         CheckConstraint('quantity >= 0', name='chk_qty_nonneg'),
-        Index('ix_inventory_items_market', 'listed_for_sale', 'is_verified', 'quantity'),
+        Index('ix_inventory_items_market', 'listed_for_sale', 'verification_status', 'quantity'),
+        # Public inventory listings filter on is_public/is_verified and join cards
+        Index(
+            'ix_inventory_items_public', 'is_public', 'verification_status', 'card_id',
+            postgresql_where=db.text("is_public AND verification_status = 'verified'"),
+        ),
+        # Shop search joins cards for verified, in-stock items listed for sale;
+        # only those rows are indexed
+        Index(
+            'ix_inventory_items_for_sale', 'card_id',
+            postgresql_where=db.text("listed_for_sale AND verification_status = 'verified' AND quantity > 0"),
+            sqlite_where=db.text("listed_for_sale AND verification_status = 'verified' AND quantity > 0"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -423,12 +610,11 @@ class InventoryItem(db.Model):
     card_id: Mapped[int] = mapped_column(Integer, ForeignKey('cards.id'), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     condition: Mapped[str] = mapped_column(String(20), nullable=False, default='Near Mint')
-    verification_status: Mapped[str] = mapped_column(String(20), nullable=False, default='unverified')  # unverified, pending, verified
-    is_verified: Mapped[bool] = mapped_column(db.Boolean, default=False, nullable=False)  # Keep for backward compatibility
-    added_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    verification_status: Mapped[str] = mapped_column(_VERIFICATION_STATUS, nullable=False, default='unverified')  # unverified, pending, verified
+    added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
     verified_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     verified_by: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow, nullable=True)
     notes: Mapped[str] = mapped_column(Text, nullable=True)  # Additional notes about the item
     grade: Mapped[str] = mapped_column(String(10), nullable=True)  # PSA/BGS grade if applicable
     language: Mapped[str] = mapped_column(String(20), nullable=True, default='English')  # Card language
@@ -442,6 +628,18 @@ class InventoryItem(db.Model):
     card = relationship("Card")
     verifier = relationship("User", foreign_keys=[verified_by])
 
+    @hybrid_property
+    def is_verified(self):
+        """Whether the item is verified; derived from verification_status"""
+        return self.verification_status == 'verified'
+
+    @is_verified.inplace.setter
+    def _is_verified_setter(self, value):
+        if value:
+            self.verification_status = 'verified'
+        elif self.verification_status == 'verified':
+            self.verification_status = 'unverified'
+
     @property
     def owner(self):
         """Get the owner of this inventory item"""
@@ -450,22 +648,26 @@ class InventoryItem(db.Model):
     @property
     def card_name(self):
         """Get card name through relationship"""
-        return self.card.name if self.card else 'Unknown Card'
+        card = self.card
+        return card.name if card else 'Unknown Card'
 
     @property
     def card_set(self):
         """Get card set through relationship"""
-        return self.card.set_name if self.card else 'Unknown'
+        card = self.card
+        return card.set_name if card else 'Unknown'
 
     @property
     def card_rarity(self):
         """Get card rarity through relationship"""
-        return self.card.rarity if self.card else 'Unknown'
+        card = self.card
+        return card.rarity if card else 'Unknown'
 
     @property
     def market_value(self):
         """Get market value from card"""
-        return float(self.card.price) if self.card else 0.0
+        card = self.card
+        return float(card.price) if card else 0.0
 
     @property
     def total_value(self):
@@ -475,17 +677,10 @@ class InventoryItem(db.Model):
     @property
     def verification_status_display(self):
         """Get human-readable verification status"""
-        status_map = {
-            'unverified': 'Unverified',
-            'pending': 'Pending Review',
-            'verified': 'Verified'
-        }
-        return status_map.get(self.verification_status, 'Unknown')
+        return _VERIFICATION_STATUS_DISPLAY.get(self.verification_status, 'Unknown')
 
-    def update_verification_status(self, new_status, admin_user, notes=None):
+    def update_verification_status(self, new_status, admin_user, notes=None, ip_address=None):
         """Update verification status with audit logging and user account status check"""
-        from datetime import datetime
-
         old_status = self.verification_status
 
         # Check user's account status before allowing verification changes
@@ -500,16 +695,17 @@ class InventoryItem(db.Model):
 
         # Update the status
         self.verification_status = new_status
-        self.is_verified = (new_status == 'verified')  # Keep backward compatibility
 
+        # One timestamp for every field this change touches
+        now = datetime.utcnow()
         if new_status == 'verified':
-            self.verified_at = datetime.utcnow()
+            self.verified_at = now
             self.verified_by = admin_user.id
         elif new_status == 'unverified':
             self.verified_at = None
             self.verified_by = None
 
-        self.updated_at = datetime.utcnow()
+        self.updated_at = now
 
         # Create audit log
         VerificationAuditLog.create_log(
@@ -519,75 +715,49 @@ class InventoryItem(db.Model):
             previous_status=old_status,
             new_status=new_status,
             notes=notes,
-            ip_address=None,  # Will be set by the route
-            user_agent=None   # Will be set by the route
+            ip_address=ip_address
         )
 
     def to_dict(self):
         """Convert inventory item to dictionary for API responses"""
-        return {
-            'id': self.id,
-            'inventory_id': self.inventory_id,
-            'card_id': self.card_id,
-            'card_name': self.card_name,
-            'card_set': self.card_set,
-            'card_rarity': self.card_rarity,
-            'quantity': self.quantity,
-            'condition': self.condition,
-            'verification_status': self.verification_status,
-            'verification_status_display': self.verification_status_display,
-            'is_verified': self.is_verified,
-            'market_value': self.market_value,
-            'total_value': self.total_value,
-            'added_at': self.added_at.isoformat() if self.added_at else None,
-            'verified_at': self.verified_at.isoformat() if self.verified_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'notes': self.notes,
-            'grade': self.grade,
-            'language': self.language,
-            'foil_type': self.foil_type,
-            'is_mint': self.is_mint,
-            'is_public': self.is_public,
-            'listed_for_sale': self.listed_for_sale,
-            'card_image': self.card.image_url if self.card else None,
-            'owner_username': self.owner.username if self.owner else None,
-            'verifier_username': self.verifier.username if self.verifier else None
-        }
+        d = dict(zip(_INVENTORY_ITEM_KEYS, _column_values(self, _inventory_item_from_dict, _inventory_item_from_attrs)))
+        # Resolve the card once and read its columns together instead of going
+        # through the card_* / market_value properties one by one
+        card = self.card
+        if card is not None:
+            name, set_name, rarity, price, image_url = _column_values(card, _item_card_from_dict, _item_card_from_attrs)
+            market_value = float(price)
+        else:
+            name, set_name, rarity, market_value, image_url = 'Unknown Card', 'Unknown', 'Unknown', 0.0, None
+        owner, verifier = self.owner, self.verifier
+        d.update(
+            is_verified=d['verification_status'] == 'verified',
+            card_name=name,
+            card_set=set_name,
+            card_rarity=rarity,
+            verification_status_display=_VERIFICATION_STATUS_DISPLAY.get(d['verification_status'], 'Unknown'),
+            market_value=market_value,
+            total_value=market_value * d['quantity'],
+            card_image=image_url,
+            owner_username=owner.username if owner else None,
+            verifier_username=verifier.username if verifier else None,
+        )
+        return d
 
     def update_from_dict(self, data):
         """Update item from dictionary data with validation"""
-        allowed_fields = [
-            'quantity', 'condition', 'notes', 'grade', 'language', 'foil_type', 'is_mint', 'is_public'
-        ]
-
         validation_errors = []
 
-        for field in allowed_fields:
+        for field, validate in _ITEM_FIELD_VALIDATORS.items():
             if field in data:
                 try:
-                    if field == 'quantity' and data[field] is not None:
-                        value = int(data[field])
-                        if value <= 0:
-                            validation_errors.append('Quantity must be greater than 0')
-                            continue
-                        elif value > 1000:
-                            validation_errors.append('Quantity cannot exceed 1000')
-                            continue
-                        setattr(self, field, value)
-                    elif field == 'is_mint':
-                        setattr(self, field, bool(data[field]))
-                    elif field == 'notes' and data[field] and len(str(data[field])) > 1000:
-                        validation_errors.append('Notes cannot exceed 1000 characters')
-                        continue
-                    elif field == 'grade' and data[field] and len(str(data[field])) > 20:
-                        validation_errors.append('Grade cannot exceed 20 characters')
-                        continue
-                    else:
-                        setattr(self, field, data[field])
+                    setattr(self, field, validate(data[field]))
+                except _FieldError as e:
+                    validation_errors.append(str(e))
                 except (ValueError, TypeError) as e:
                     validation_errors.append(f'Invalid value for {field}: {str(e)}')
 
-        self.updated_at = func.now()
+        self.updated_at = datetime.utcnow()
 
         if validation_errors:
             raise ValueError('; '.join(validation_errors))
@@ -614,8 +784,8 @@ class ShopInventoryItem(db.Model):
     from_user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     source_inventory_item_id: Mapped[int] = mapped_column(Integer, ForeignKey('inventory_items.id'), nullable=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     # Denormalized owner username for quick display/exports
     owner: Mapped[str] = mapped_column(String(80), nullable=True)
 
@@ -631,6 +801,10 @@ class ShopInventoryItem(db.Model):
 class ShopConsignmentLog(db.Model):
     """History of items sent to or returned from shop (consignment)."""
     __tablename__ = 'shop_consignment_logs'
+    __table_args__ = (
+        # Admin consignment history lists the newest entries across all users
+        Index('ix_consignment_logs_created', 'created_at'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     card_id: Mapped[int] = mapped_column(Integer, ForeignKey('cards.id'), nullable=False, index=True)
@@ -638,19 +812,24 @@ class ShopConsignmentLog(db.Model):
     source_inventory_item_id: Mapped[int] = mapped_column(Integer, ForeignKey('inventory_items.id'), nullable=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     action: Mapped[str] = mapped_column(String(10), nullable=False)  # 'list' or 'unlist'
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     card = relationship('Card')
     from_user = relationship('User', foreign_keys=[from_user_id])
     source_item = relationship('InventoryItem', foreign_keys=[source_inventory_item_id])
 
+def _epoch_now() -> int:
+    return int(time.time())
+
+
 class CreditLedger(db.Model):
     """Balanced ledger for credit issuance, transfers, and redemptions."""
     __tablename__ = 'credit_ledger'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    entry_ts: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    # Unix epoch seconds: compact, integer-comparable index key for time-window reports
+    entry_ts: Mapped[int] = mapped_column(BigInteger, default=_epoch_now, nullable=False)
     amount_vnd: Mapped[int] = mapped_column(BigInteger, nullable=False)
     direction: Mapped[str] = mapped_column(String(10), nullable=False)  # 'debit' or 'credit'
     kind: Mapped[str] = mapped_column(String(20), nullable=False)  # 'issue','redeem','transfer_in','transfer_out','revoke','adjust'
@@ -660,7 +839,7 @@ class CreditLedger(db.Model):
     idempotency_key: Mapped[str] = mapped_column(String(255), nullable=True, unique=False)
     notes: Mapped[str] = mapped_column(Text, nullable=True)
 
-    user = relationship("User", foreign_keys=[user_id])
+    user = relationship("User", foreign_keys=[user_id], back_populates="credit_ledger")
     admin = relationship("User", foreign_keys=[admin_id])
     inventory_item = relationship("InventoryItem", foreign_keys=[related_inventory_item_id])
 
@@ -679,8 +858,9 @@ class IdempotencyKey(db.Model):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     key: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
-    last_seen_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
+    # Set when the key is replayed (credit_service._touch_idem); pruning goes by it
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     # Optional fields to aid debugging
     scope: Mapped[str] = mapped_column(String(100), nullable=True)
     request_fingerprint: Mapped[str] = mapped_column(String(255), nullable=True)
@@ -696,15 +876,16 @@ class TradeOffer(db.Model):
     status: Mapped[str] = mapped_column(String(20), nullable=False, default='pending')
     message: Mapped[str] = mapped_column(Text, nullable=True)
     counter_message: Mapped[str] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
-    # Relationships
-    sender = relationship("User", foreign_keys=[sender_id])
-    receiver = relationship("User", foreign_keys=[receiver_id])
+    # Relationships; a list of offers loads both parties and the items in one
+    # IN (...) query each rather than one query per offer
+    sender = relationship("User", foreign_keys=[sender_id], lazy='selectin')
+    receiver = relationship("User", foreign_keys=[receiver_id], lazy='selectin')
     offered_items = relationship("TradeItem", foreign_keys="TradeItem.trade_offer_id",
-                                cascade="all, delete-orphan")
+                                cascade="all, delete-orphan", lazy='selectin')
 
     def __str__(self) -> str:
         """String representation of trade offer"""
@@ -723,7 +904,7 @@ class TradeItem(db.Model):
 
     # Relationships
     trade_offer = relationship("TradeOffer", back_populates="offered_items")
-    inventory_item = relationship("InventoryItem")
+    inventory_item = relationship("InventoryItem", lazy='joined')  # many-to-one, so no row fan-out
 
     def __str__(self) -> str:
         """String representation of trade item"""
@@ -738,12 +919,12 @@ class CartSession(db.Model):
 
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User")
-    items = relationship("CartItem", backref="session", lazy=True, cascade="all, delete-orphan")
+    items = relationship("CartItem", back_populates="session", lazy=True, cascade="all, delete-orphan")
 
     def __str__(self) -> str:
         """String representation of cart session"""
@@ -753,15 +934,31 @@ class CartSession(db.Model):
 class CartItem(db.Model):
     """Individual item in shopping cart (supports both admin and user inventory)"""
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # Session-wide cart loads and clears
+        Index('ix_cart_items_session_lookup', 'session_id', 'card_id', 'inventory_item_id'),
+        # One row per card/listing per cart; add-to-cart looks these up before merging quantities
+        Index(
+            'ux_cart_items_session_admin', 'session_id', 'card_id', unique=True,
+            postgresql_where=db.text('card_id IS NOT NULL'),
+            sqlite_where=db.text('card_id IS NOT NULL'),
+        ),
+        Index(
+            'ux_cart_items_session_user', 'session_id', 'inventory_item_id', unique=True,
+            postgresql_where=db.text('inventory_item_id IS NOT NULL'),
+            sqlite_where=db.text('inventory_item_id IS NOT NULL'),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     session_id: Mapped[str] = mapped_column(String(255), ForeignKey('cart_sessions.id'), nullable=False)
     card_id: Mapped[int] = mapped_column(Integer, ForeignKey('cards.id'), nullable=True)  # For admin items
     inventory_item_id: Mapped[int] = mapped_column(Integer, ForeignKey('inventory_items.id'), nullable=True)  # For user items
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
-    added_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     # Relationships
+    session = relationship("CartSession", back_populates="items")
     card = relationship("Card")  # For admin items
     inventory_item = relationship("InventoryItem")  # For user items
 
@@ -813,28 +1010,32 @@ class CartItem(db.Model):
 
     def to_dict(self):
         """Convert cart item to dictionary for templates"""
+        # Resolve the item type and price once; every derived field reuses them
+        item_type = self.item_type
+        price = self.display_price
         base_dict = {
             'id': self.id,
             'session_id': self.session_id,
             'quantity': self.quantity,
-            'item_type': self.item_type,
+            'item_type': item_type,
             'seller_info': self.seller_info,
-            'display_price': float(self.display_price),
+            'display_price': float(price),
             'available_quantity': self.available_quantity,
-            'added_at': self.added_at.isoformat() if self.added_at else None
+            'added_at': self.added_at
         }
 
-        if self.item_type == 'admin' and self.card:
+        if item_type == 'admin' and self.card:
             base_dict['card'] = self.card.to_dict()
-            base_dict['item_total'] = float(self.card.price * self.quantity)
-        elif self.item_type == 'user' and self.inventory_item:
+            base_dict['item_total'] = float(price * self.quantity)
+        elif item_type == 'user' and self.inventory_item:
+            item = self.inventory_item
             base_dict['inventory_item'] = {
-                'id': self.inventory_item.id,
-                'condition': self.inventory_item.condition,
-                'market_price': float(self.inventory_item.card.price if self.inventory_item.card else 0)
+                'id': item.id,
+                'condition': item.condition,
+                'market_price': float(price)
             }
-            base_dict['card'] = self.inventory_item.card.to_dict() if self.inventory_item.card else None
-            base_dict['item_total'] = float((self.inventory_item.card.price if self.inventory_item.card else 0) * self.quantity)
+            base_dict['card'] = item.card.to_dict() if item.card else None
+            base_dict['item_total'] = float(price * self.quantity)
 
         return base_dict
 
@@ -855,8 +1056,8 @@ class Coupon(db.Model):
     """Discount coupon for orders"""
     __tablename__ = "coupons"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    code: Mapped[str] = mapped_column(String(20), unique=True, nullable=False, index=True)  # Coupon code (e.g., SAVE10)
+    id: Mapped[int] = mapped_column(Integer, Identity(start=1, cache=50), primary_key=True)
+    code: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)  # Coupon code (e.g., SAVE10)
     discount_percentage: Mapped[float] = mapped_column(Numeric(5, 2), nullable=False)  # Discount percentage (0-100)
     description: Mapped[str] = mapped_column(String(255), nullable=True)  # Optional description
     valid_from: Mapped[datetime] = mapped_column(DateTime, nullable=True)  # Start date for validity
@@ -864,8 +1065,8 @@ class Coupon(db.Model):
     usage_limit: Mapped[int] = mapped_column(Integer, nullable=True)  # Maximum number of uses (None = unlimited)
     usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Current usage count
     is_active: Mapped[bool] = mapped_column(db.Boolean, default=True, nullable=False)  # Whether coupon is active
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
 
     def is_valid(self) -> bool:
         """Check if coupon is currently valid"""
@@ -910,13 +1111,13 @@ class Coupon(db.Model):
             'code': self.code,
             'discount_percentage': float(self.discount_percentage),
             'description': self.description,
-            'valid_from': self.valid_from.isoformat() if self.valid_from else None,
-            'valid_until': self.valid_until.isoformat() if self.valid_until else None,
+            'valid_from': self.valid_from,
+            'valid_until': self.valid_until,
             'usage_limit': self.usage_limit,
             'usage_count': self.usage_count,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_valid': self.is_valid(),
             'can_be_used': self.can_be_used()
         }
@@ -926,6 +1127,61 @@ class Coupon(db.Model):
         return f"Coupon: {self.code} ({self.discount_percentage}% off)"
 
 
+# Audit rows are queued per request and written with one executemany INSERT per
+# table: inside the caller's next commit, or at request teardown for rows logged
+# after it. Outside a request (CLI, scripts) they are written immediately.
+
+def _queue_audit_row(model, row):
+    """Queue an audit log row for the current request"""
+    row.setdefault('created_at', datetime.utcnow())
+    if not has_request_context():
+        db.session.execute(insert(model), [row])
+        db.session.commit()
+        return
+    g.setdefault('_audit_rows', []).append((model, row))
+
+
+def _write_audit_rows(session, queued):
+    by_model = {}
+    for model, row in queued:
+        by_model.setdefault(model, []).append(row)
+    for model, rows in by_model.items():
+        session.execute(insert(model), rows)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _write_queued_audit_rows(session):
+    queued = g.pop('_audit_rows', None) if has_request_context() else None
+    if queued:
+        _write_audit_rows(session, queued)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_queued_audit_rows(session):
+    # Rows queued since the last commit describe changes that were rolled back
+    if has_request_context():
+        g.pop('_audit_rows', None)
+
+
+def flush_audit_logs(exc=None):
+    """Write audit rows still queued at the end of a request in their own transaction.
+
+    Nothing is written when the request raised (`exc`): the action the rows
+    describe may not have happened.
+    """
+    queued = g.pop('_audit_rows', None)
+    if not queued or exc is not None:
+        return
+    try:
+        # Anything left uncommitted by the request is discarded at teardown anyway
+        db.session.rollback()
+        _write_audit_rows(db.session, queued)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error writing audit logs: {e}")
+
+
 # User Management Audit Models
 
 class UserAuditLog(db.Model):
@@ -939,7 +1195,7 @@ class UserAuditLog(db.Model):
     details: Mapped[str] = mapped_column(Text, nullable=True)
     ip_address: Mapped[str] = mapped_column(String(45), nullable=True)
     user_agent: Mapped[str] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
@@ -949,25 +1205,32 @@ class UserAuditLog(db.Model):
     def create_log(user_id, admin_id, action, details=None, ip_address=None, user_agent=None):
         """Create a new audit log entry"""
         try:
-            audit_log = UserAuditLog(
+            _queue_audit_row(UserAuditLog, dict(
                 user_id=user_id,
                 admin_id=admin_id,
                 action=action,
                 details=details,
                 ip_address=ip_address,
                 user_agent=user_agent
-            )
-            db.session.add(audit_log)
-            db.session.commit()
+            ))
         except Exception as e:
             db.session.rollback()
-            print(f"Error creating audit log: {e}")
+            logger.error(f"Error creating audit log: {e}")
 
     def __str__(self) -> str:
         """String representation of audit log"""
         return f"AuditLog: {self.admin.username} {self.action} {self.user.username}"
 
 
+def _verification_status_bool(status):
+    """Map a verification status to the boolean stored in the audit log (None for pending/unknown)"""
+    if status == 'verified':
+        return True
+    if status == 'unverified':
+        return False
+    return None
+
+
 class VerificationAuditLog(db.Model):
     """Detailed audit log for card verification actions"""
     __tablename__ = "verification_audit_logs"
@@ -980,7 +1243,7 @@ class VerificationAuditLog(db.Model):
     new_status: Mapped[bool] = mapped_column(db.Boolean, nullable=True)
     notes: Mapped[str] = mapped_column(Text, nullable=True)
     ip_address: Mapped[str] = mapped_column(String(45), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     # Relationships
     inventory_item = relationship("InventoryItem")
@@ -990,31 +1253,18 @@ class VerificationAuditLog(db.Model):
     def create_log(inventory_item_id, admin_id, action, previous_status=None, new_status=None, notes=None, ip_address=None, user_agent=None):
         """Create a new verification audit log entry"""
         try:
-            # Convert string status values to boolean for database storage
-            def status_to_bool(status):
-                if status == 'verified':
-                    return True
-                elif status == 'unverified':
-                    return False
-                elif status == 'pending':
-                    return None
-                else:
-                    return None  # Unknown status
-
-            audit_log = VerificationAuditLog(
+            _queue_audit_row(VerificationAuditLog, dict(
                 inventory_item_id=inventory_item_id,
                 admin_id=admin_id,
                 action=action,
-                previous_status=status_to_bool(previous_status),
-                new_status=status_to_bool(new_status),
+                previous_status=_verification_status_bool(previous_status),
+                new_status=_verification_status_bool(new_status),
                 notes=notes,
                 ip_address=ip_address
-            )
-            db.session.add(audit_log)
-            db.session.commit()
+            ))
         except Exception as e:
             db.session.rollback()
-            print(f"Error creating verification audit log: {e}")
+            logger.error(f"Error creating verification audit log: {e}")
 
     def __str__(self) -> str:
         """String representation of verification audit log"""
@@ -1024,15 +1274,21 @@ class VerificationAuditLog(db.Model):
 class InventoryTransferLog(db.Model):
     """Audit log for item transfers between users (credit and non-credit)."""
     __tablename__ = 'inventory_transfer_logs'
+    __table_args__ = (
+        # A user's transfer history pages newest-first; also serves plain from_user_id lookups
+        Index('ix_inventory_transfer_logs_from_user_ts', 'from_user_id', 'created_at'),
+        # Admin transfer history pages newest-first across all users
+        Index('ix_inventory_transfer_logs_created', 'created_at'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    from_user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    from_user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     to_user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     card_id: Mapped[int] = mapped_column(Integer, ForeignKey('cards.id'), nullable=False, index=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     is_credit: Mapped[bool] = mapped_column(db.Boolean, nullable=False, default=False)
     idempotency_key: Mapped[str] = mapped_column(String(255), nullable=True, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
 
     # Relationships
     from_user = relationship('User', foreign_keys=[from_user_id])
@@ -1052,55 +1308,84 @@ class InventoryTransferLog(db.Model):
             'quantity': self.quantity,
             'is_credit': self.is_credit,
             'idempotency_key': self.idempotency_key,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
         }
 
+# Rows per executemany batch in bulk_seed; ~10k is a safe size across PostgreSQL and SQLite
+SEED_BATCH_SIZE = int(os.environ.get('SEED_BATCH_SIZE', '10000'))
+
+
+def bulk_seed(model, rows, chunk=None):
+    """Insert `rows` (a list of column dicts) for `model` with Core executemany.
+
+    Skips the ORM unit of work entirely, so no instances are created and
+    relationship/event hooks don't run. The caller commits.
+    """
+    chunk = chunk or SEED_BATCH_SIZE
+    stmt = db.insert(model)
+    for i in range(0, len(rows), chunk):
+        db.session.execute(stmt, rows[i:i + chunk])
+
+
+# Seed statements are built once at import; SQLAlchemy's compiled cache then
+# reuses their SQL on every call. A lightweight table construct rather than
+# User.__table__ keeps ORM-side column defaults out of the INSERT, for columns
+# an older DB may not have yet.
+_SEED_USERS_TABLE = table('users', column('id'), column('username'), column('password_hash'), column('role'),
+                          column('account_status'), column('two_factor_enabled'))
+_PG_SEED_USERS = pg_insert(_SEED_USERS_TABLE).on_conflict_do_nothing(index_elements=['username'])
+_SQLITE_SEED_USERS = sqlite_insert(_SEED_USERS_TABLE).on_conflict_do_nothing(index_elements=['username'])
+_USER_INVENTORY_INSERT = db.insert(UserInventory)
+
+
 def initialize_default_users():
     """Initialize default admin and test users if they don't exist"""
     try:
-        # Check if admin user exists - use raw SQL to avoid column issues during migration
-        result = db.session.execute(db.text("SELECT id, role FROM users WHERE username = 'admin'")).first()
-        if not result:
+        # Probe both default users in one round-trip - use raw SQL to avoid column issues during migration
+        existing = dict(db.session.execute(
+            db.text("SELECT username, role FROM users WHERE username IN ('admin', 'user')")
+        ).all())
+
+        rows = []
+        if 'admin' not in existing:
             admin_password = os.environ.get('ADMIN_PASSWORD', 'admin123')
-            admin_hash = generate_password_hash(admin_password)
-            # Use raw SQL to insert to avoid column mapping issues
-            db.session.execute(db.text("""
-                INSERT INTO users (username, password_hash, role, account_status, two_factor_enabled)
-                VALUES (:username, :password_hash, :role, :account_status, :two_factor_enabled)
-            """), {
-                'username': 'admin',
-                'password_hash': admin_hash,
-                'role': 'super_admin',
-                'account_status': 'active',
-                'two_factor_enabled': False
-            })
-        elif result and result[1] != 'super_admin':
+            rows.append({'username': 'admin', 'password_hash': _default_password_hash(admin_password), 'role': 'super_admin'})
+        elif existing['admin'] != 'super_admin':
             # Update existing admin user to super_admin role
             db.session.execute(db.text("""
                 UPDATE users SET role = 'super_admin' WHERE username = 'admin'
             """))
+        if 'user' not in existing:
+            rows.append({'username': 'user', 'password_hash': _default_password_hash('user123'), 'role': 'user'})
+
+        if rows:
+            for row in rows:
+                row.update(account_status='active', two_factor_enabled=False)
+            dialect = db.engine.dialect
+            stmt = _PG_SEED_USERS if dialect.name == 'postgresql' else _SQLITE_SEED_USERS
+            if dialect.insert_executemany_returning:
+                # Only rows this call actually inserted come back, so the inventory
+                # below is created once even if another worker seeded concurrently
+                inserted = dict(db.session.execute(
+                    stmt.returning(_SEED_USERS_TABLE.c.username, _SEED_USERS_TABLE.c.id), rows
+                ).all())
+                user_id = inserted.get('user')
+            else:
+                db.session.execute(stmt, rows)
+                user_id = None
+                if 'user' not in existing:
+                    user_id = db.session.execute(db.text("SELECT id FROM users WHERE username = 'user'")).scalar_one()
 
-        # Check if test user exists
-        result = db.session.execute(db.text("SELECT id FROM users WHERE username = 'user'")).first()
-        if not result:
-            user_hash = generate_password_hash('user123')
-            db.session.execute(db.text("""
-                INSERT INTO users (username, password_hash, role, account_status, two_factor_enabled)
-                VALUES (:username, :password_hash, :role, :account_status, :two_factor_enabled)
-            """), {
-                'username': 'user',
-                'password_hash': user_hash,
-                'role': 'user',
-                'account_status': 'active',
-                'two_factor_enabled': False
-            })
-
-            # Create default inventory for test user
-            user_inventory = UserInventory(user_id=db.session.execute(db.text("SELECT id FROM users WHERE username = 'user'")).first()[0], is_public=True)
-            db.session.add(user_inventory)
+            if user_id is not None:
+                # Create default inventory for test user
+                db.session.execute(_USER_INVENTORY_INSERT, {'user_id': user_id, 'is_public': True})
 
         # Commit changes
         db.session.commit()
     except Exception as e:
         db.session.rollback()
-        print(f"Error initializing users: {e}")
+        logger.error(f"Error initializing users: {e}")
+
+
+# Configure all mappers now rather than on the first query of the first request
+configure_mappers()
@@ -6,9 +6,9 @@ from storage_db import storage
 from models import (
     User, Card, Order, OrderItem,
     UserInventory, InventoryItem, TradeOffer, TradeItem,
-    CartSession, CartItem, UserAuditLog, VerificationAuditLog,
+    CartSession, CartItem, UserAuditLog,
     Coupon, ShopInventoryItem, ShopConsignmentLog,
-    InventoryTransferLog,
+    InventoryTransferLog, flush_audit_logs,
 )
 from auth import admin_required, get_redirect_target
 from decimal import Decimal
@@ -16,8 +16,9 @@ import logging
 import re
 from functools import wraps
 from typing import Any, Dict, Optional, Sequence
-from sqlalchemy.orm import load_only
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload, undefer
 from sqlalchemy import String
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import uuid
 
@@ -128,7 +129,7 @@ def _build_cards_context(
     user_cards = []
     if any([query_text, set_filter, rarity_filter, foiling_filter, class_filters, min_price is not None, max_price is not None]):
         user_items_query = InventoryItem.query.join(Card).filter(
-            InventoryItem.is_verified == True,
+            InventoryItem.is_verified,
             InventoryItem.quantity > 0,
             InventoryItem.listed_for_sale == True
         )
@@ -204,19 +205,19 @@ def _build_cards_context(
     all_classes = storage.get_unique_classes()
 
     user_sets = db.session.query(Card.set_name.distinct()).join(InventoryItem).filter(
-        InventoryItem.is_verified == True,
+        InventoryItem.is_verified,
         InventoryItem.is_public == True
     ).all()
     user_rarities = db.session.query(Card.rarity.distinct()).join(InventoryItem).filter(
-        InventoryItem.is_verified == True,
+        InventoryItem.is_verified,
         InventoryItem.is_public == True
     ).all()
     user_foilings = db.session.query(Card.foiling.distinct()).join(InventoryItem).filter(
-        InventoryItem.is_verified == True,
+        InventoryItem.is_verified,
         InventoryItem.is_public == True
     ).all()
     user_classes = db.session.query(Card.card_class.distinct()).join(InventoryItem).filter(
-        InventoryItem.is_verified == True,
+        InventoryItem.is_verified,
         InventoryItem.is_public == True
     ).all()
 
@@ -679,7 +680,7 @@ def view_cart():
     total_price = 0
 
     # Get or create cart session
-    cart_session = _get_or_create_cart_session()
+    cart_session = _get_or_create_cart_session(*_CART_ITEM_LOADS)
     logger.info(f"Cart session: {cart_session.id if cart_session else 'None'}")
     logger.info(f"Cart session user_id: {cart_session.user_id if cart_session else 'None'}")
 
@@ -1245,6 +1246,7 @@ def order_confirmation(order_id):
     # Avoid selecting columns that may not exist yet (e.g., 'email' before migration)
     order = (
         Order.query.options(
+            selectinload(Order.items).selectinload(OrderItem.card),
             load_only(
                 Order.id,
                 Order.customer_name,
@@ -1302,6 +1304,7 @@ def withdrawal_confirmation(order_id):
     """Specialized confirmation page for withdrawal-created orders."""
     order = (
         Order.query.options(
+            selectinload(Order.items).selectinload(OrderItem.card),
             load_only(
                 Order.id,
                 Order.customer_name,
@@ -1451,8 +1454,9 @@ def login():
         
         # Authenticate user with database
         user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password) and user.is_active():
-            # Record successful login
+        if user and user.check_password(password) and user.can_login():
+            # Lift an expired suspension and record the successful login
+            user.reap_expired_suspension()
             user.record_login_attempt(success=True)
             db.session.commit()
 
@@ -1630,7 +1634,7 @@ def users():
 
         # Add inventory count to each user
         for user in users_list:
-            user_inventory = UserInventory.query.filter_by(user_id=user.id).first()
+            user_inventory = UserInventory.query.options(selectinload(UserInventory.items)).filter_by(user_id=user.id).first()
             if user_inventory:
                 user.inventory_count = sum(item.quantity for item in user_inventory.items)
             else:
@@ -1653,18 +1657,21 @@ def user_inventory():
     """User's personal inventory page"""
     try:
         # Get or create user's inventory
-        user_inventory = UserInventory.query.filter_by(user_id=current_user.id).first()
+        user_inventory = UserInventory.query.options(selectinload(UserInventory.items).selectinload(InventoryItem.card)).filter_by(user_id=current_user.id).first()
 
         if not user_inventory:
             # Create inventory if it doesn't exist
             user_inventory = UserInventory(user=current_user, is_public=False)
             db.session.add(user_inventory)
             db.session.commit()
+            items = []
+        else:
+            items = user_inventory.items
 
         # Get inventory items with card details
         inventory_items = []
-        if user_inventory.items:
-            for item in user_inventory.items:
+        if items:
+            for item in items:
                 # Hide items with zero quantity from inventory display
                 if getattr(item, 'quantity', 0) <= 0:
                     continue
@@ -1789,7 +1796,6 @@ def api_withdraw_consignment(shop_item_id):
                     quantity=qty,
                     condition='Near Mint',
                     verification_status='verified',
-                    is_verified=True,
                     notes='[withdraw_from_shop]',
                     language='English',
                     foil_type='Non Foil',
@@ -1827,7 +1833,7 @@ def view_user_inventory(user_id):
         target_user = User.query.get_or_404(user_id)
 
         # Check if the target user's inventory is public
-        user_inventory = UserInventory.query.filter_by(user_id=user_id).first()
+        user_inventory = UserInventory.query.options(selectinload(UserInventory.items).selectinload(InventoryItem.card)).filter_by(user_id=user_id).first()
 
         if not user_inventory or not user_inventory.is_public:
             flash('This user\'s inventory is not public.', 'error')
@@ -2068,7 +2074,6 @@ def add_inventory_item():
                     quantity=quantity,
                     condition=data.get('condition', existing_item.condition),
                     verification_status='unverified',
-                    is_verified=False,
                     notes=data.get('notes', f'Duplicate of verified item - {existing_item.notes or ""}'),
                     grade=data.get('grade', existing_item.grade),
                     language=data.get('language', existing_item.language),
@@ -2104,7 +2109,6 @@ def add_inventory_item():
                 quantity=quantity,
                 condition=data.get('condition', 'Near Mint'),
                 verification_status='unverified',
-                is_verified=False,  # New items need verification
                 notes=data.get('notes', ''),
                 grade=data.get('grade'),
                 language=data.get('language', 'English'),
@@ -2382,7 +2386,7 @@ def get_inventory_stats_api():
     """API endpoint to get inventory statistics"""
     try:
         # Get user's inventory
-        user_inventory = UserInventory.query.filter_by(user_id=current_user.id).first()
+        user_inventory = UserInventory.query.options(selectinload(UserInventory.items).selectinload(InventoryItem.card)).filter_by(user_id=current_user.id).first()
         if not user_inventory:
             return jsonify({
                 'success': True,
@@ -2511,7 +2515,7 @@ def duplicate_inventory_item_api(item_id):
             card_id=original_item.card_id,
             quantity=original_item.quantity,
             condition=original_item.condition,
-            is_verified=False,  # New item needs verification
+            verification_status='unverified',  # New item needs verification
             notes=f"Duplicate of {original_item.card_name}",
             grade=original_item.grade,
             language=original_item.language,
@@ -2883,7 +2887,7 @@ def download_user_inventory_csv():
 
     try:
         # Get user's inventory
-        user_inventory = UserInventory.query.filter_by(user_id=current_user.id).first()
+        user_inventory = UserInventory.query.options(selectinload(UserInventory.items).selectinload(InventoryItem.card)).filter_by(user_id=current_user.id).first()
         if not user_inventory:
             flash('No inventory found', 'error')
             return redirect(url_for('user_inventory'))
@@ -3375,6 +3379,11 @@ def internal_error(error):
     return render_template('base.html', error_title="Internal Server Error", 
                          error_message="Something went wrong on our end."), 500
 
+@app.teardown_request
+def write_audit_logs(exc):
+    """Write audit log rows queued after the request's last commit, unless it raised"""
+    flush_audit_logs(exc)
+
 # Template context processors
 @app.context_processor
 def cart_processor():
@@ -3729,8 +3738,22 @@ def list_flashed_messages():
         })
     return messages
 
-def _get_or_create_cart_session():
-    """Get or create a cart session for the current user"""
+# CartItem.to_dict reads the store card, or the listing's card and seller;
+# load them for the whole cart up front
+_CART_ITEM_LOADS = (
+    selectinload(CartSession.items).options(
+        selectinload(CartItem.card),
+        selectinload(CartItem.inventory_item).options(
+            joinedload(InventoryItem.card),
+            joinedload(InventoryItem.inventory).joinedload(UserInventory.user),
+        ),
+        raiseload('*'),
+    ),
+)
+
+
+def _get_or_create_cart_session(*loads):
+    """Get or create a cart session for the current user; `loads` are loader options for the lookup"""
     logger.info("=== GET OR CREATE CART SESSION DEBUG ===")
 
     # Use session ID as cart session identifier
@@ -3744,7 +3767,7 @@ def _get_or_create_cart_session():
         logger.info(f"Generated new session ID: {session_id}")
 
     # Try to find existing cart session
-    cart_session = CartSession.query.filter_by(id=session_id).first()
+    cart_session = CartSession.query.options(*loads).filter_by(id=session_id).first()
     logger.info(f"Found existing cart session: {cart_session.id if cart_session else 'None'}")
 
     if not cart_session:
@@ -3765,6 +3788,14 @@ def _get_or_create_cart_session():
 
     return cart_session
 
+def _find_cart_line(session_id, item_type, item_id):
+    """Return the cart line for an admin card or user inventory item, if any"""
+    if item_type == 'admin':
+        return CartItem.query.filter_by(session_id=session_id, card_id=item_id).first()
+    if item_type == 'user':
+        return CartItem.query.filter_by(session_id=session_id, inventory_item_id=item_id).first()
+    return None
+
 def _add_to_cart(item_type, item_id, quantity=1):
     """Add item to cart (supports both admin and user inventory items)"""
     logger.info("=== ADD TO CART DEBUG ===")
@@ -3804,17 +3835,7 @@ def _add_to_cart(item_type, item_id, quantity=1):
             return False, "Invalid item type"
 
         # Check if item already in cart
-        existing_item = None
-        if item_type == 'admin':
-            existing_item = CartItem.query.filter_by(
-                session_id=cart_session.id,
-                card_id=item_id
-            ).first()
-        elif item_type == 'user':
-            existing_item = CartItem.query.filter_by(
-                session_id=cart_session.id,
-                inventory_item_id=item_id
-            ).first()
+        existing_item = _find_cart_line(cart_session.id, item_type, item_id)
 
         logger.info(f"Existing cart item: {existing_item.id if existing_item else 'None'}")
 
@@ -3834,7 +3855,17 @@ def _add_to_cart(item_type, item_id, quantity=1):
             )
             db.session.add(cart_item)
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request inserted the same line first; the partial
+            # unique indexes reject ours, so fold the quantity into theirs.
+            db.session.rollback()
+            existing_item = _find_cart_line(cart_session.id, item_type, item_id)
+            if existing_item is None:
+                raise
+            existing_item.quantity = min(existing_item.quantity + quantity, available_quantity)
+            db.session.commit()
         logger.info("Successfully committed cart changes")
         return True, "Item added to cart"
 
@@ -3848,7 +3879,7 @@ def _add_to_cart(item_type, item_id, quantity=1):
 @admin_required
 def admin_orders():
     """Admin orders list page"""
-    orders = Order.query.order_by(Order.created_at.desc()).all()
+    orders = Order.query.options(selectinload(Order.items).selectinload(OrderItem.card)).order_by(Order.created_at.desc()).all()
     # Exclude withdrawal-created orders from the main list
     filtered_orders = []
     for o in orders:
@@ -3952,7 +3983,7 @@ def admin_withdraw_reject(request_id):
 @admin_required
 def admin_order_detail(order_id):
     """Admin order detail page"""
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(selectinload(Order.items).selectinload(OrderItem.card)).get_or_404(order_id)
 
     # Get order items with card details and owner attribution
     order_items = []
@@ -4044,7 +4075,6 @@ def api_list_inventory_item(item_id):
                             quantity=qty_to_move,
                             condition=item.condition,
                             verification_status=item.verification_status,
-                            is_verified=item.is_verified,
                             notes=(item.notes or '') + ' [consigned_to_shop]',
                             grade=item.grade,
                             language=item.language,
@@ -4143,7 +4173,7 @@ def api_list_inventory_item(item_id):
 @admin_required
 def admin_fulfill_order(order_id):
     """Confirm an order"""
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(selectinload(Order.items)).get_or_404(order_id)
 
     if order.status != 'pending':
         flash('Only pending orders can be confirmed', 'warning')
@@ -4178,7 +4208,6 @@ def admin_fulfill_order(order_id):
                         existing = InventoryItem.query.filter_by(inventory_id=inv.id, card_id=oi.card_id).first()
                         if existing:
                             existing.quantity += int(oi.quantity)
-                            existing.is_verified = True
                             existing.verification_status = 'verified'
                             existing.updated_at = db.func.now()
                             db.session.add(existing)
@@ -4189,7 +4218,6 @@ def admin_fulfill_order(order_id):
                                 quantity=int(oi.quantity),
                                 condition='Near Mint',
                                 verification_status='verified',
-                                is_verified=True,
                                 notes=f'Added from order {order.id}',
                                 language='English',
                                 foil_type='Non Foil',
@@ -4260,7 +4288,7 @@ def admin_ship_order(order_id):
         """Export user data as CSV"""
         try:
             # Get all users
-            users = User.query.order_by(User.created_at.desc()).all()
+            users = User.query.options(undefer(User.suspension_reason)).order_by(User.created_at.desc()).all()
     
             # Create CSV content
             import io
@@ -4345,7 +4373,7 @@ def admin_ship_order(order_id):
 @admin_required
 def admin_reject_order(order_id):
     """Reject an order and restore stock"""
-    order = Order.query.get_or_404(order_id)
+    order = Order.query.options(selectinload(Order.items).selectinload(OrderItem.card)).get_or_404(order_id)
 
     if order.status != 'pending':
         flash('Only pending orders can be rejected', 'warning')
@@ -4523,10 +4551,10 @@ def admin_users():
 @admin_required
 def admin_user_detail(user_id):
     """View detailed information about a specific user"""
-    user = User.query.get_or_404(user_id)
+    user = User.query.options(undefer(User.suspension_reason)).get_or_404(user_id)
 
     # Get user's inventory and items
-    user_inventory = UserInventory.query.filter_by(user_id=user_id).first()
+    user_inventory = UserInventory.query.options(selectinload(UserInventory.items).selectinload(InventoryItem.card)).filter_by(user_id=user_id).first()
     inventory_stats = {'total_items': 0, 'verified_items': 0, 'total_value': 0}
     inventory_items = []
 
@@ -4579,13 +4607,26 @@ def admin_user_detail(user_id):
 # Transfer history (user and admin)
 # ---------------------------------
 
+# InventoryTransferLog.to_dict reads both users and the card; load them in one
+# IN query each per page instead of one query per row
+_TRANSFER_LOG_LOADS = (
+    selectinload(InventoryTransferLog.from_user),
+    selectinload(InventoryTransferLog.to_user),
+    selectinload(InventoryTransferLog.card),
+    raiseload('*'),
+)
+
+
 @app.route('/inventory/transfers')
 @login_required
 def my_transfer_history():
     try:
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
-        q = InventoryTransferLog.query.filter_by(from_user_id=current_user.id).order_by(InventoryTransferLog.created_at.desc())
+        q = (InventoryTransferLog.query
+             .options(*_TRANSFER_LOG_LOADS)
+             .filter_by(from_user_id=current_user.id)
+             .order_by(InventoryTransferLog.created_at.desc()))
         pagination = q.paginate(page=page, per_page=per_page, error_out=False)
         rows = [row.to_dict() for row in pagination.items]
         return render_template('transfer_history.html',
@@ -4605,7 +4646,7 @@ def admin_transfer_history():
         per_page = int(request.args.get('per_page', 50))
         search = (request.args.get('q') or '').strip()
 
-        q = InventoryTransferLog.query
+        q = InventoryTransferLog.query.options(*_TRANSFER_LOG_LOADS)
         if search:
             # Search on usernames or numeric IDs
             like = f"%{search}%"
@@ -4636,7 +4677,7 @@ def admin_transfer_history():
 @admin_required
 def admin_edit_user(user_id):
     """Edit user details"""
-    user = User.query.get_or_404(user_id)
+    user = User.query.options(undefer(User.suspension_reason)).get_or_404(user_id)
 
     # Prevent regular admins from editing super admin users
     if user.is_super_admin() and not current_user.is_super_admin():
@@ -4873,7 +4914,7 @@ def admin_export_users():
     import io
 
     try:
-        users = User.query.order_by(User.created_at.desc()).all()
+        users = User.query.options(undefer(User.suspension_reason)).order_by(User.created_at.desc()).all()
 
         # Create CSV content
         output = io.StringIO()
@@ -4943,20 +4984,11 @@ def admin_update_verification_status(user_id, item_id):
         item.update_verification_status(
             new_status=new_status,
             admin_user=current_user,
-            notes=notes
+            notes=notes,
+            ip_address=request.remote_addr
         )
 
-        # Set IP address and user agent for audit log
-        audit_log = VerificationAuditLog.query.filter_by(
-            inventory_item_id=item.id,
-            admin_id=current_user.id
-        ).order_by(VerificationAuditLog.created_at.desc()).first()
-
-        if audit_log:
-            audit_log.ip_address = request.remote_addr
-            audit_log.user_agent = request.headers.get('User-Agent')
-            db.session.commit()
-
+        # Commits the status change together with its audit log row
         db.session.commit()
 
         status_display = item.verification_status_display
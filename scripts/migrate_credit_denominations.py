@@ -25,7 +25,6 @@ def _merge_inventory_item(inv_id: int, card_id: int, add_units: int) -> Inventor
         card_id=card_id,
         quantity=add_units,
         verification_status='verified',
-        is_verified=True,
     )
     db.session.add(item)
     return item
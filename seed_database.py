@@ -3,7 +3,7 @@
 Seed database with sample trading cards
 """
 from app import app, db
-from models import Card, User
+from models import Card, User, bulk_seed
 from werkzeug.security import generate_password_hash
 
 
@@ -90,15 +90,13 @@ def seed_cards():
         print(f"Database already has {existing_cards} cards. Skipping seeding.")
         return
     
-    # Add sample cards
-    cards_added = 0
+    # Add sample cards in one executemany
     for card_data in sample_cards:
-        card = Card(**card_data)
-        db.session.add(card)
-        cards_added += 1
         print(f"Added: {card_data['name']} - {card_data['price']} VND")
-    
+    cards_added = len(sample_cards)
+
     try:
+        bulk_seed(Card, sample_cards)
         db.session.commit()
         print(f"\n✅ Successfully seeded {cards_added} cards to the database!")
     except Exception as e:
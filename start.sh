@@ -9,6 +9,9 @@ source venv/bin/activate
 # Load environment variables
 export $(cat .env | xargs)
 
+# Create tables and default users (idempotent)
+flask --app main init-db
+
 # Start application with Gunicorn
 gunicorn --bind 0.0.0.0:5000 --workers 3 main:app
 
@@ -566,7 +566,7 @@ class DatabaseStorage:
                             card_id=card.id,
                             quantity=quantity,
                             condition=condition,
-                            is_verified=False,  # New items need verification
+                            verification_status='unverified',  # New items need verification
                             notes=row.get('notes', '').strip(),
                             grade=row.get('grade', '').strip(),
                             language=language,
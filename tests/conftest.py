@@ -16,6 +16,10 @@ from storage import InMemoryStorage
 from storage_db import DatabaseStorage
 from models import User
 
+# Tables and default users are no longer created on import
+with app.app.app_context():
+    app.init_db()
+
 
 @pytest.fixture
 def app_instance():
@@ -0,0 +1,62 @@
+"""
+Tests for request-scoped audit log writes
+"""
+import pytest
+from app import app, db
+from models import User, UserAuditLog
+
+
+@pytest.fixture
+def user_ids():
+    """Ids of the seeded admin and test users; test audit rows are removed afterwards"""
+    with app.app_context():
+        admin = User.query.filter_by(username='admin').first()
+        user = User.query.filter_by(username='user').first()
+        yield admin.id, user.id
+        db.session.rollback()
+        UserAuditLog.query.filter(UserAuditLog.action.like('test_%')).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def _actions():
+    return [row.action for row in UserAuditLog.query.filter(UserAuditLog.action.like('test_%'))]
+
+
+class TestAuditLogQueue:
+    """Audit rows follow the outcome of the request that logged them"""
+
+    def test_rows_commit_with_the_request(self, user_ids):
+        admin_id, user_id = user_ids
+        with app.test_request_context():
+            UserAuditLog.create_log(user_id, admin_id, 'test_commit')
+            assert _actions() == []
+            db.session.commit()
+        assert _actions() == ['test_commit']
+
+    def test_rows_dropped_on_rollback(self, user_ids):
+        admin_id, user_id = user_ids
+        with app.test_request_context():
+            UserAuditLog.create_log(user_id, admin_id, 'test_rollback')
+            db.session.rollback()
+            db.session.commit()
+            app.do_teardown_request(None)
+        assert _actions() == []
+
+    def test_rows_after_last_commit_written_at_teardown(self, user_ids):
+        admin_id, user_id = user_ids
+        with app.test_request_context():
+            UserAuditLog.create_log(user_id, admin_id, 'test_teardown')
+            app.do_teardown_request(None)
+        assert _actions() == ['test_teardown']
+
+    def test_rows_not_written_when_request_raised(self, user_ids):
+        admin_id, user_id = user_ids
+        with app.test_request_context():
+            UserAuditLog.create_log(user_id, admin_id, 'test_raised')
+            app.do_teardown_request(RuntimeError('boom'))
+        assert _actions() == []
+
+    def test_written_immediately_outside_a_request(self, user_ids):
+        admin_id, user_id = user_ids
+        UserAuditLog.create_log(user_id, admin_id, 'test_cli')
+        assert _actions() == ['test_cli']
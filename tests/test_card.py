@@ -0,0 +1,34 @@
+"""
+Tests for Card.to_dict
+"""
+from datetime import datetime
+
+from models import Card
+
+
+def _card(**kwargs):
+    values = dict(id=7, name='Dict Card', set_name='SET', rarity='Common', condition='Near Mint',
+                  price=1.5, quantity=2, foiling='NF', art_style='normal', is_deleted=False,
+                  created_at=datetime(2025, 1, 2, 3, 4, 5), updated_at=None)
+    values.update(kwargs)
+    return Card(**values)
+
+
+class TestCardToDict:
+    """to_dict fills template defaults and always reflects the current values"""
+
+    def test_defaults_for_empty_columns(self):
+        d = _card().to_dict()
+        assert d['id'] == '7'
+        assert d['language'] == 'English'
+        assert d['card_class'] == 'General'
+        assert d['description'] == d['image_url'] == d['card_code'] == ''
+        assert d['created_at'] == datetime(2025, 1, 2, 3, 4, 5)
+        assert d['updated_at'] is None
+
+    def test_reflects_unflushed_edits(self):
+        card = _card()
+        card.to_dict()['name'] = 'changed by caller'
+        assert card.to_dict()['name'] == 'Dict Card'
+        card.quantity = 0
+        assert card.to_dict()['quantity'] == 0
@@ -0,0 +1,64 @@
+"""
+Tests for adding items to the cart
+"""
+import pytest
+import routes
+from app import app, db
+from models import Card, CartItem, CartSession
+
+SESSION_ID = 'test-cart-session'
+
+
+@pytest.fixture
+def card():
+    """An admin card with limited stock; the test cart is removed afterwards"""
+    with app.app_context():
+        card = Card(name='Cart Test Card', price=1.5, quantity=3)
+        db.session.add(card)
+        db.session.commit()
+        yield card
+        db.session.rollback()
+        CartItem.query.filter_by(session_id=SESSION_ID).delete(synchronize_session=False)
+        CartSession.query.filter_by(id=SESSION_ID).delete(synchronize_session=False)
+        Card.query.filter_by(id=card.id).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def _add(card_id, quantity):
+    with app.test_request_context():
+        routes.session['_id'] = SESSION_ID
+        return routes._add_to_cart('admin', card_id, quantity)
+
+
+def _lines(card_id):
+    return [item.quantity for item in CartItem.query.filter_by(session_id=SESSION_ID, card_id=card_id)]
+
+
+class TestAddToCart:
+    """Repeated adds merge into one cart line, capped at the available stock"""
+
+    def test_repeat_add_merges(self, card):
+        assert _add(card.id, 1)[0]
+        assert _add(card.id, 1)[0]
+        assert _lines(card.id) == [2]
+
+    def test_merge_clamped_to_stock(self, card):
+        assert _add(card.id, 2)[0]
+        assert _add(card.id, 2)[0]
+        assert _lines(card.id) == [3]
+
+    def test_concurrent_insert_merges_into_existing_line(self, card, monkeypatch):
+        assert _add(card.id, 2)[0]
+        # Simulate a racing request: the lookup misses the line that is already there
+        real_lookup = routes._find_cart_line
+        calls = []
+
+        def stale_lookup(*args):
+            calls.append(args)
+            return None if len(calls) == 1 else real_lookup(*args)
+
+        monkeypatch.setattr(routes, '_find_cart_line', stale_lookup)
+        ok, message = _add(card.id, 2)
+        assert ok, message
+        assert len(calls) == 2
+        assert _lines(card.id) == [3]
@@ -0,0 +1,94 @@
+"""
+Tests for credit service idempotency keys
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from app import app, db
+from models import IdempotencyKey
+from credit_service import ServiceError, _check_idempotency, claim_idem, prune_idempotency_keys
+
+
+@pytest.fixture
+def db_session():
+    """Application context with idempotency keys removed afterwards"""
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+        IdempotencyKey.query.filter(IdempotencyKey.scope == 'test').delete()
+        db.session.commit()
+
+
+class TestClaimIdem:
+    """Test the single-statement idempotency claim"""
+
+    def test_first_claim_inserts(self, db_session):
+        key = f'test:{uuid.uuid4()}'
+        key_id, inserted = claim_idem(key, 'test', fingerprint='fp')
+        db_session.commit()
+
+        assert inserted is True
+        row = db_session.get(IdempotencyKey, key_id)
+        assert row.key == key
+        assert row.request_fingerprint == 'fp'
+
+    def test_replay_returns_existing_id(self, db_session):
+        key = f'test:{uuid.uuid4()}'
+        first_id, _ = claim_idem(key, 'test')
+        db_session.commit()
+
+        replay_id, inserted = claim_idem(key, 'test')
+        assert inserted is False
+        assert replay_id == first_id
+        assert IdempotencyKey.query.filter_by(key=key).count() == 1
+
+    def test_check_idempotency_rejects_replay(self, db_session):
+        key = f'test:{uuid.uuid4()}'
+        _check_idempotency(key, 'test')
+        db_session.commit()
+
+        with pytest.raises(ServiceError) as exc:
+            _check_idempotency(key, 'test')
+        assert exc.value.code == 'IDEMPOTENT_REPLAY'
+        assert exc.value.http == 409
+
+
+class TestLastSeen:
+    """A replay records when the key was last seen; pruning goes by it"""
+
+    def _old_key(self, db_session):
+        key = f'test:{uuid.uuid4()}'
+        claim_idem(key, 'test')
+        IdempotencyKey.query.filter_by(key=key).update({'created_at': datetime.utcnow() - timedelta(days=30)})
+        db_session.commit()
+        return key
+
+    def _exists(self, key):
+        return IdempotencyKey.query.filter_by(key=key).count() == 1
+
+    def test_replay_sets_last_seen(self, db_session):
+        key = self._old_key(db_session)
+        claim_idem(key, 'test')
+        db_session.commit()
+        assert IdempotencyKey.query.filter_by(key=key).one().last_seen_at > datetime.utcnow() - timedelta(minutes=1)
+
+    def test_replayed_key_survives(self, db_session):
+        idle, replayed = self._old_key(db_session), self._old_key(db_session)
+        claim_idem(replayed, 'test')
+        db_session.commit()
+
+        prune_idempotency_keys(7)
+        db_session.commit()
+        assert not self._exists(idle)
+        assert self._exists(replayed)
+
+    def test_rejected_replay_still_counts(self, db_session):
+        key = self._old_key(db_session)
+        with pytest.raises(ServiceError):
+            _check_idempotency(key, 'test')
+        db_session.rollback()
+
+        prune_idempotency_keys(7)
+        db_session.commit()
+        assert self._exists(key)
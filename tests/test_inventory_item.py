@@ -0,0 +1,69 @@
+"""
+Tests for the InventoryItem.is_verified hybrid over verification_status
+"""
+import pytest
+from app import app, db
+from models import Card, InventoryItem, User, UserInventory
+
+
+@pytest.fixture
+def make_item():
+    """Create inventory items for the seeded test user; removed afterwards"""
+    created = []
+    with app.app_context():
+        user = User.query.filter_by(username='user').first()
+        inventory = UserInventory.query.filter_by(user_id=user.id).first()
+        card = Card(name='Hybrid Test Card', price=1.0, quantity=0)
+        db.session.add(card)
+        db.session.commit()
+
+        def _make(status):
+            item = InventoryItem(inventory_id=inventory.id, card_id=card.id, verification_status=status)
+            db.session.add(item)
+            db.session.commit()
+            created.append(item.id)
+            return item
+
+        yield _make
+        db.session.rollback()
+        InventoryItem.query.filter(InventoryItem.id.in_(created)).delete(synchronize_session=False)
+        Card.query.filter_by(id=card.id).delete(synchronize_session=False)
+        db.session.commit()
+
+
+class TestIsVerifiedSetter:
+    """Assigning is_verified writes verification_status"""
+
+    @pytest.mark.parametrize('status', ['unverified', 'pending', 'verified'])
+    def test_true_marks_verified(self, make_item, status):
+        item = make_item(status)
+        item.is_verified = True
+        db.session.commit()
+        assert item.verification_status == 'verified'
+        assert item.is_verified
+
+    def test_false_unverifies_verified_item(self, make_item):
+        item = make_item('verified')
+        item.is_verified = False
+        db.session.commit()
+        assert item.verification_status == 'unverified'
+
+    def test_false_keeps_pending(self, make_item):
+        item = make_item('pending')
+        item.is_verified = False
+        db.session.commit()
+        assert item.verification_status == 'pending'
+
+
+class TestIsVerifiedExpression:
+    """is_verified works as a SQL filter"""
+
+    def test_filter(self, make_item):
+        ids = {status: make_item(status).id for status in ('unverified', 'pending', 'verified')}
+        verified = {item.id for item in InventoryItem.query.filter(InventoryItem.is_verified)}
+        assert ids['verified'] in verified
+        assert not verified & {ids['unverified'], ids['pending']}
+
+    def test_filter_by(self, make_item):
+        item = make_item('verified')
+        assert InventoryItem.query.filter_by(id=item.id, is_verified=True).one().id == item.id
@@ -0,0 +1,74 @@
+"""
+Tests for the JSON wire format of API responses
+"""
+from datetime import datetime
+
+import pytest
+from app import app, db
+from flask import jsonify
+from models import Card, InventoryItem, User, UserInventory
+
+
+@pytest.fixture
+def user_item():
+    """An inventory item with fixed timestamps owned by the seeded test user"""
+    with app.app_context():
+        user = User.query.filter_by(username='user').first()
+        inventory = UserInventory.query.filter_by(user_id=user.id).first()
+        card = Card(name='JSON Shape Card', set_name='JSON-TEST', rarity='Common', price=1000, quantity=1)
+        db.session.add(card)
+        db.session.flush()
+        item = InventoryItem(
+            inventory_id=inventory.id, card_id=card.id, quantity=1, condition='Near Mint',
+            added_at=datetime(2025, 1, 2, 3, 4, 5),
+            updated_at=datetime(2025, 1, 2, 3, 4, 5, 678000),
+        )
+        db.session.add(item)
+        db.session.commit()
+        yield user.id, item.id
+        db.session.rollback()
+        InventoryItem.query.filter_by(card_id=card.id).delete()
+        Card.query.filter_by(set_name='JSON-TEST').delete()
+        db.session.commit()
+
+
+class TestJSONProvider:
+    """Datetimes keep the format the models used to produce with isoformat()"""
+
+    def test_naive_datetime_has_no_offset(self):
+        value = datetime(2025, 1, 2, 3, 4, 5, 678000)
+        assert app.json.loads(app.json.dumps({'at': value})) == {'at': value.isoformat()}
+
+    def test_whole_second_datetime_omits_microseconds(self):
+        assert app.json.dumps(datetime(2025, 1, 2, 3, 4, 5)) == '"2025-01-02T03:04:05"'
+
+    def test_inventory_api_timestamps(self, user_item):
+        user_id, item_id = user_item
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+
+        response = client.get('/api/inventory/items?per_page=100')
+        assert response.status_code == 200
+        item = next(i for i in response.get_json()['items'] if i['id'] == item_id)
+        assert item['added_at'] == '2025-01-02T03:04:05'
+        assert item['updated_at'] == '2025-01-02T03:04:05.678000'
+        assert item['verified_at'] is None
+
+
+class TestKeyOrder:
+    """Keys are sorted by default, as with Flask's default provider"""
+
+    def test_dumps_sorts_keys(self):
+        assert app.json.dumps({'b': 1, 'a': {'d': 2, 'c': 3}}) == '{"a":{"c":3,"d":2},"b":1}'
+
+    def test_jsonify_sorts_keys(self):
+        with app.test_request_context():
+            assert jsonify(success=True, items=[], error=None).get_data(as_text=True) == (
+                '{"error":null,"items":[],"success":true}'
+            )
+
+    def test_sort_keys_can_be_turned_off(self, monkeypatch):
+        monkeypatch.setattr(app.json, 'sort_keys', False)
+        assert app.json.dumps({'b': 1, 'a': 2}) == '{"b":1,"a":2}'
@@ -0,0 +1,120 @@
+"""
+Tests for login eligibility by account status
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from app import app, db
+from models import User
+from werkzeug.security import generate_password_hash
+
+PASSWORD = 'status-pass-123'
+
+
+@pytest.fixture
+def make_user():
+    """Create users with a given account status; removed afterwards"""
+    created = []
+
+    def _make(username, status='active', expires=None):
+        user = User(
+            username=username,
+            password_hash=generate_password_hash(PASSWORD),
+            role='user',
+            account_status=status,
+            suspension_reason='test' if status == 'suspended' else None,
+            suspension_expires=expires,
+        )
+        db.session.add(user)
+        db.session.commit()
+        created.append(username)
+        return user
+
+    with app.app_context():
+        yield _make
+        db.session.rollback()
+        User.query.filter(User.username.in_(created)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def _login(username):
+    client = app.test_client()
+    return client.post('/login', data={'username': username, 'password': PASSWORD})
+
+
+class TestCanLogin:
+    """User.can_login is read-only and treats an expired suspension as lifted"""
+
+    def test_active(self, make_user):
+        assert make_user('login_active').can_login()
+
+    def test_banned(self, make_user):
+        assert not make_user('login_banned', status='banned').can_login()
+
+    def test_currently_suspended(self, make_user):
+        user = make_user('login_suspended', status='suspended',
+                         expires=datetime.utcnow() + timedelta(days=1))
+        assert not user.can_login()
+        assert user.is_suspended()
+
+    def test_suspended_without_expiry(self, make_user):
+        assert not make_user('login_suspended_open', status='suspended').can_login()
+
+    def test_expired_suspension(self, make_user):
+        user = make_user('login_expired', status='suspended',
+                         expires=datetime.utcnow() - timedelta(minutes=1))
+        assert user.can_login()
+        # Checking eligibility does not change the account
+        assert user.is_suspended()
+
+    def test_reap_only_lifts_expired_suspensions(self, make_user):
+        current = make_user('login_reap_current', status='suspended',
+                            expires=datetime.utcnow() + timedelta(days=1))
+        assert current.reap_expired_suspension() is False
+        assert current.is_suspended()
+
+        expired = make_user('login_reap_expired', status='suspended',
+                            expires=datetime.utcnow() - timedelta(minutes=1))
+        assert expired.reap_expired_suspension() is True
+        db.session.commit()
+        db.session.expire_all()
+
+        reloaded = db.session.get(User, expired.id)
+        assert reloaded.account_status == 'active'
+        assert reloaded.suspension_reason is None
+        assert reloaded.suspension_expires is None
+
+
+class TestLoginRoute:
+    """POST /login accepts or rejects users by account status"""
+
+    def test_active_user_logs_in(self, make_user):
+        make_user('route_active')
+        response = _login('route_active')
+        assert response.status_code == 302
+
+    def test_banned_user_rejected(self, make_user):
+        make_user('route_banned', status='banned')
+        response = _login('route_banned')
+        assert response.status_code == 200
+        assert b'Invalid username or password' in response.data
+
+    def test_suspended_user_rejected(self, make_user):
+        user = make_user('route_suspended', status='suspended',
+                         expires=datetime.utcnow() + timedelta(days=1))
+        response = _login('route_suspended')
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert db.session.get(User, user.id).is_suspended()
+
+    def test_expired_suspension_logs_in_and_is_lifted(self, make_user):
+        user = make_user('route_expired', status='suspended',
+                         expires=datetime.utcnow() - timedelta(minutes=1))
+        response = _login('route_expired')
+        assert response.status_code == 302
+
+        db.session.expire_all()
+        reloaded = db.session.get(User, user.id)
+        assert reloaded.account_status == 'active'
+        assert reloaded.suspension_expires is None
+        assert reloaded.last_login is not None
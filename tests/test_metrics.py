@@ -0,0 +1,40 @@
+"""
+Tests for the per-thread metric counters
+"""
+import gc
+import threading
+
+from metrics import _Counter
+
+
+def _run_threads(counters, count, name='requests'):
+    for _ in range(count):
+        t = threading.Thread(target=counters.inc, args=(name,))
+        t.start()
+        t.join()
+
+
+class TestCounterShards:
+    """Shards of exited threads are folded into the base counts"""
+
+    def test_totals_survive_thread_exit(self):
+        counters = _Counter()
+        _run_threads(counters, 50)
+        gc.collect()
+        assert 'requests 50\n' in counters.render_prom()
+
+    def test_shard_count_stays_bounded(self):
+        counters = _Counter()
+        _run_threads(counters, 500)
+        gc.collect()
+        assert len(counters._shards) <= 1
+        assert counters._base['requests'] == 500
+
+    def test_live_and_retired_shards_are_merged(self):
+        counters = _Counter()
+        counters.inc('requests', amount=3)
+        _run_threads(counters, 10)
+        gc.collect()
+        output = counters.render_prom()
+        assert '# TYPE requests counter\n' in output
+        assert 'requests 13\n' in output
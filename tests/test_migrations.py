@@ -0,0 +1,74 @@
+"""
+Tests for Alembic data migrations, run against a scratch SQLite database
+"""
+import importlib.util
+import os
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+VERSIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations', 'versions')
+
+
+def _load(filename):
+    spec = importlib.util.spec_from_file_location(filename[:-3], os.path.join(VERSIONS, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(engine, module, direction):
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn, opts={'render_as_batch': True})):
+            getattr(module, direction)()
+
+
+@pytest.fixture
+def ledger_engine():
+    """credit_ledger as it was before the epoch migration, with text timestamps"""
+    engine = sa.create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE credit_ledger (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+            "entry_ts DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, amount_vnd BIGINT NOT NULL)"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_credit_ledger_user_ts ON credit_ledger (user_id, entry_ts)")
+        conn.exec_driver_sql(
+            "INSERT INTO credit_ledger (user_id, entry_ts, amount_vnd) VALUES "
+            "(1, '2025-01-02 03:04:05', 100), (1, '2025-06-30 23:59:59', 200)"
+        )
+    yield engine
+    engine.dispose()
+
+
+class TestCreditLedgerEpochTs:
+    """20251110_credit_ledger_epoch_ts converts entry_ts text dates to epoch seconds"""
+
+    migration = _load('20251110_credit_ledger_epoch_ts.py')
+
+    def _rows(self, engine):
+        with engine.connect() as conn:
+            return conn.exec_driver_sql(
+                "SELECT entry_ts, typeof(entry_ts) FROM credit_ledger ORDER BY id"
+            ).all()
+
+    def test_upgrade_converts_existing_rows(self, ledger_engine):
+        _run(ledger_engine, self.migration, 'upgrade')
+        assert self._rows(ledger_engine) == [(1735787045, 'integer'), (1751327999, 'integer')]
+        indexes = {ix['name'] for ix in sa.inspect(ledger_engine).get_indexes('credit_ledger')}
+        assert 'ix_credit_ledger_user_ts' in indexes
+
+    def test_upgrade_server_default(self, ledger_engine):
+        _run(ledger_engine, self.migration, 'upgrade')
+        with ledger_engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO credit_ledger (user_id, amount_vnd) VALUES (2, 300)")
+        value, kind = self._rows(ledger_engine)[-1]
+        assert kind == 'integer'
+        assert value > 1735787045
+
+    def test_downgrade_round_trip(self, ledger_engine):
+        _run(ledger_engine, self.migration, 'upgrade')
+        _run(ledger_engine, self.migration, 'downgrade')
+        assert [row[0] for row in self._rows(ledger_engine)] == ['2025-01-02 03:04:05', '2025-06-30 23:59:59']
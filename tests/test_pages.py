@@ -0,0 +1,91 @@
+"""
+Smoke tests for pages that read lazy='raise' relationships
+
+Order.items, UserInventory.items, User.orders and User.credit_ledger raise on
+implicit loads, so these pages must eager-load them explicitly.
+"""
+import pytest
+from app import app, db
+from models import Card, InventoryItem, Order, OrderItem, User, UserInventory
+
+ORDER_ID = 'ORD-TEST-PAGES'
+
+
+@pytest.fixture
+def data():
+    """An order and an inventory listing owned by the seeded test user
+
+    Requests run outside the fixture's app context so each one starts with an
+    empty session, as in production; otherwise the identity map would hide
+    missing eager loads.
+    """
+    with app.app_context():
+        admin = User.query.filter_by(username='admin').first()
+        user = User.query.filter_by(username='user').first()
+        inventory = UserInventory.query.filter_by(user_id=user.id).first()
+        if inventory is None:
+            inventory = UserInventory(user_id=user.id)
+            db.session.add(inventory)
+        card = Card(name='Page Test Card', price=2.0, quantity=5)
+        db.session.add(card)
+        db.session.flush()
+        item = InventoryItem(inventory_id=inventory.id, card_id=card.id, quantity=1,
+                             verification_status='verified')
+        order = Order(id=ORDER_ID, user_id=user.id, customer_name='Test User',
+                      contact_number='0123456789', shipment_method='pickup', total_amount=2.0)
+        db.session.add_all([item, order])
+        db.session.flush()
+        db.session.add(OrderItem(order_id=order.id, card_id=card.id, quantity=1,
+                                 unit_price=2.0, total_price=2.0))
+        db.session.commit()
+        ids = {'admin': admin.id, 'user': user.id, 'card': card.id, 'item': item.id}
+    yield ids
+    with app.app_context():
+        OrderItem.query.filter_by(order_id=ORDER_ID).delete(synchronize_session=False)
+        Order.query.filter_by(id=ORDER_ID).delete(synchronize_session=False)
+        InventoryItem.query.filter_by(id=ids['item']).delete(synchronize_session=False)
+        Card.query.filter_by(id=ids['card']).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def _client(user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    return client
+
+
+class TestUserPages:
+    """Order and inventory pages render for their owner"""
+
+    @pytest.mark.parametrize('path', [
+        '/my-orders',
+        f'/order/{ORDER_ID}',
+        '/inventory',
+        '/inventory/consigned',
+        '/inventory/transfers',
+    ])
+    def test_page_renders(self, data, path):
+        response = _client(data['user']).get(path)
+        assert response.status_code == 200, path
+
+
+class TestAdminPages:
+    """Admin dashboards render with orders, inventories and ledgers present"""
+
+    @pytest.mark.parametrize('path', [
+        '/admin',
+        '/admin/orders',
+        f'/admin/orders/{ORDER_ID}',
+        '/admin/consignments',
+        '/admin/transfers',
+        '/admin/users',
+    ])
+    def test_page_renders(self, data, path):
+        response = _client(data['admin']).get(path)
+        assert response.status_code == 200, path
+
+    def test_user_detail_renders(self, data):
+        response = _client(data['admin']).get(f"/admin/users/{data['user']}")
+        assert response.status_code == 200
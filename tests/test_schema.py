@@ -0,0 +1,78 @@
+"""
+Tests for model column types, defaults and default-user seeding
+"""
+import time
+
+import pytest
+from app import app, db
+from models import (
+    CreditLedger, InventoryItem, Order, User, UserInventory,
+    _PG_SEED_USERS, _SEED_USERS_TABLE, _SQLITE_SEED_USERS, initialize_default_users,
+)
+from sqlalchemy import Enum
+
+
+@pytest.fixture
+def ctx():
+    """App context; uncommitted changes are rolled back afterwards"""
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+class TestStatusEnums:
+    """Status columns are enums restricted to the statuses the app uses"""
+
+    @pytest.mark.parametrize('column, name, values', [
+        (User.account_status, 'user_account_status', ['active', 'suspended', 'banned']),
+        (InventoryItem.verification_status, 'inventory_verification_status', ['unverified', 'pending', 'verified']),
+        (Order.status, 'order_status', ['pending', 'confirmed', 'shipped', 'rejected']),
+    ])
+    def test_enum_type(self, column, name, values):
+        column_type = column.property.columns[0].type
+        assert isinstance(column_type, Enum)
+        assert column_type.name == name
+        assert column_type.enums == values
+
+    def test_defaults(self):
+        assert User.account_status.property.columns[0].default.arg == 'active'
+        assert InventoryItem.verification_status.property.columns[0].default.arg == 'unverified'
+        assert Order.status.property.columns[0].default.arg == 'pending'
+
+
+class TestCreditLedgerEntryTs:
+    """entry_ts defaults to the current unix epoch second"""
+
+    def test_default_is_epoch_seconds(self, ctx):
+        user = User.query.filter_by(username='user').first()
+        before = int(time.time())
+        entry = CreditLedger(user_id=user.id, amount_vnd=1000, direction='credit', kind='adjust',
+                             notes='test_entry_ts')
+        db.session.add(entry)
+        db.session.flush()
+        assert isinstance(entry.entry_ts, int)
+        assert before <= entry.entry_ts <= int(time.time())
+
+
+class TestInitializeDefaultUsers:
+    """Seeding is idempotent: no duplicate users or inventories"""
+
+    def _counts(self):
+        user = User.query.filter_by(username='user').one()
+        return (User.query.filter(User.username.in_(['admin', 'user'])).count(),
+                UserInventory.query.filter_by(user_id=user.id).count())
+
+    def test_repeat_runs(self, ctx):
+        initialize_default_users()
+        initialize_default_users()
+        assert self._counts() == (2, 1)
+
+    def test_insert_skips_existing_username(self, ctx):
+        stmt = _PG_SEED_USERS if db.engine.dialect.name == 'postgresql' else _SQLITE_SEED_USERS
+        inserted = db.session.execute(
+            stmt.returning(_SEED_USERS_TABLE.c.username),
+            [{'username': 'admin', 'password_hash': 'x', 'role': 'super_admin',
+              'account_status': 'active', 'two_factor_enabled': False}],
+        ).all()
+        assert inserted == []
+        assert self._counts() == (2, 1)
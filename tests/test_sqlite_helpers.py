@@ -0,0 +1,180 @@
+"""
+Tests for the manual SQLite migration helpers
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+
+import apply_card_class_column
+import apply_drop_inventory_is_verified
+import apply_inventory_is_verified_default
+import apply_orders_linking_migration
+import apply_sqlite_migrations
+import sqlalchemy as sa
+from app import db
+from migrations._conn import backfill_pragmas, open_db
+from models import InventoryItem
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+def _make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cards (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO cards (name) VALUES ('a'), ('b')")
+    conn.commit()
+    conn.close()
+
+
+class TestBackfillPragmas:
+    """The backfill settings never outlive the helper that applied them"""
+
+    def test_settings_restored_on_exit(self, tmp_path):
+        path = str(tmp_path / 'pragmas.db')
+        _make_db(path)
+        with open_db(path) as conn:
+            with backfill_pragmas(conn):
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+    def test_helper_leaves_journal_mode_unchanged(self, tmp_path):
+        path = str(tmp_path / 'helper.db')
+        _make_db(path)
+        assert apply_card_class_column._apply_to_db(path) is True
+        with open_db(path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+            assert conn.execute("SELECT DISTINCT card_class FROM cards").fetchall() == [('General',)]
+
+
+class TestOrdersLinking:
+    """orders.id is a string, so the backfills must not window on it"""
+
+    def _make_orders_db(self, path):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        conn.execute("CREATE TABLE orders (id VARCHAR(20) PRIMARY KEY, customer_name TEXT)")
+        conn.execute("INSERT INTO users (id, email) VALUES (7, 'buyer@example.com')")
+        conn.executemany("INSERT INTO orders (id, customer_name) VALUES (?, ?)",
+                         [(f"ORD-20240101-{n:04d}", 'buyer') for n in range(2500)])
+        conn.commit()
+        conn.close()
+
+    def test_backfills_string_ids(self, tmp_path):
+        path = str(tmp_path / 'orders.db')
+        self._make_orders_db(path)
+        with open_db(path) as conn:
+            # email is added by the helper; seed it on a rerun-style DB
+            conn.execute("ALTER TABLE orders ADD COLUMN email VARCHAR(120)")
+            conn.execute("UPDATE orders SET email = 'buyer@example.com' WHERE id LIKE '%-000_'")
+        assert apply_orders_linking_migration._apply(path) is True
+        with open_db(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM orders WHERE order_number IS NULL OR order_number <> id").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM orders WHERE user_id = 7").fetchone()[0] == 10
+
+
+class TestLegacyIsVerified:
+    """Inserts keep working while inventory_items still has the NOT NULL is_verified column"""
+
+    def _make_legacy_db(self, path):
+        engine = sa.create_engine(f"sqlite:///{path}")
+        db.metadata.create_all(engine, tables=[t for t in db.metadata.sorted_tables if t.name != 'inventory_items'])
+        table = InventoryItem.__table__
+        ddl = str(CreateTable(table).compile(engine)).replace(
+            'listed_for_sale BOOLEAN NOT NULL,', 'listed_for_sale BOOLEAN NOT NULL,\n\tis_verified BOOLEAN NOT NULL,', 1)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(ddl)
+            for index in table.indexes:
+                conn.exec_driver_sql(str(CreateIndex(index).compile(engine)))
+            conn.exec_driver_sql(
+                "INSERT INTO inventory_items (inventory_id, card_id, quantity, condition, verification_status, "
+                "is_public, listed_for_sale, is_verified) VALUES (1, 1, 1, 'Near Mint', 'unverified', 1, 0, 1)"
+            )
+        return engine
+
+    def _legacy(self, engine):
+        with engine.connect() as conn:
+            return conn.exec_driver_sql("SELECT id, is_verified FROM inventory_items ORDER BY id").all()
+
+    def test_inserts_and_updates_keep_column_in_sync(self, tmp_path):
+        path = str(tmp_path / 'legacy.db')
+        engine = self._make_legacy_db(path)
+        assert apply_inventory_is_verified_default._apply_to_db(path) is True
+        assert apply_inventory_is_verified_default._apply_to_db(path) is True
+
+        with Session(engine) as session:
+            verified = InventoryItem(inventory_id=1, card_id=2, verification_status='verified')
+            pending = InventoryItem(inventory_id=1, card_id=3, verification_status='pending')
+            session.add_all([verified, pending])
+            session.commit()
+            assert self._legacy(engine) == [(1, 1), (verified.id, 1), (pending.id, 0)]
+
+            verified.is_verified = False
+            pending.is_verified = True
+            session.commit()
+            assert self._legacy(engine) == [(1, 1), (verified.id, 0), (pending.id, 1)]
+
+        indexes = {ix['name'] for ix in sa.inspect(engine).get_indexes('inventory_items')}
+        assert {ix.name for ix in InventoryItem.__table__.indexes} <= indexes
+        engine.dispose()
+
+    def test_drop_removes_sync_triggers(self, tmp_path):
+        path = str(tmp_path / 'legacy.db')
+        self._make_legacy_db(path).dispose()
+        apply_inventory_is_verified_default._apply_to_db(path)
+        assert apply_drop_inventory_is_verified._apply_to_db(path) is True
+        with open_db(path) as conn:
+            assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall() == []
+            assert conn.execute("SELECT verification_status FROM inventory_items").fetchall() == [('verified',)]
+
+
+class TestApplyAll:
+    """apply_all reports failure if any helper fails, and never drops is_verified unasked"""
+
+    def test_startup_helpers(self):
+        assert [h.__module__ for h in apply_sqlite_migrations.STARTUP_HELPERS] == [
+            'apply_owner_columns',
+            'apply_card_code_column',
+            'apply_card_language_column',
+            'apply_card_class_column',
+            'apply_order_tracking_columns',
+            'apply_inventory_is_verified_default',
+        ]
+        assert apply_drop_inventory_is_verified._apply_to_db not in apply_sqlite_migrations.ALL_HELPERS
+
+    def test_current_schema_succeeds_on_every_run(self, tmp_path):
+        path = str(tmp_path / 'current.db')
+        engine = sa.create_engine(f"sqlite:///{path}")
+        db.metadata.create_all(engine)
+        engine.dispose()
+        assert apply_sqlite_migrations.apply_all(path) is True
+        assert apply_sqlite_migrations.apply_all(path) is True
+
+    def test_any_failure_fails(self, tmp_path):
+        path = str(tmp_path / 'helpers.db')
+        _make_db(path)
+        calls = []
+
+        def helper(ok):
+            return lambda db_path, conn: calls.append(ok) or ok
+
+        assert apply_sqlite_migrations.apply_all(path, (helper(True), helper(False), helper(True))) is False
+        assert calls == [True, False, True]
+        assert apply_sqlite_migrations.apply_all(path, (helper(True), helper(True))) is True
+
+    def _run_cli(self, path, *args):
+        repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, LOTUS_TCG_DB_PATH=path)
+        return subprocess.run([sys.executable, 'apply_sqlite_migrations.py', *args],
+                              cwd=repo, env=env, capture_output=True).returncode
+
+    def test_cli_drops_is_verified_only_when_asked(self, tmp_path):
+        path = str(tmp_path / 'legacy.db')
+        TestLegacyIsVerified()._make_legacy_db(path).dispose()
+        assert self._run_cli(path) == 0
+        with open_db(path) as conn:
+            assert 'is_verified' in {row[1] for row in conn.execute("PRAGMA table_info(inventory_items)")}
+        assert self._run_cli(path, apply_sqlite_migrations.DROP_IS_VERIFIED_FLAG) == 0
+        with open_db(path) as conn:
+            assert 'is_verified' not in {row[1] for row in conn.execute("PRAGMA table_info(inventory_items)")}
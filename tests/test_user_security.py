@@ -0,0 +1,73 @@
+"""
+Tests for password hashing and reset tokens on the User model
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from models import User, _safe_eq
+from werkzeug.security import generate_password_hash
+
+
+def _user(password_hash='', **kwargs):
+    return User(username='security_test', password_hash=password_hash, role='user', **kwargs)
+
+
+class TestSafeEq:
+    """_safe_eq compares strings in constant time"""
+
+    def test_equal(self):
+        assert _safe_eq('token-123', 'token-123')
+
+    @pytest.mark.parametrize('other', ['token-124', 'token-12', '', 'tökén'])
+    def test_not_equal(self, other):
+        assert not _safe_eq('token-123', other)
+
+
+class TestCheckPassword:
+    """Legacy werkzeug hashes are upgraded to argon2 on a successful check"""
+
+    def test_werkzeug_hash_upgraded(self):
+        user = _user(generate_password_hash('secret-pass'))
+        assert user.check_password('secret-pass')
+        assert user.password_hash.startswith('$argon2')
+        assert user.check_password('secret-pass')
+
+    def test_werkzeug_hash_kept_on_wrong_password(self):
+        legacy = generate_password_hash('secret-pass')
+        user = _user(legacy)
+        assert not user.check_password('wrong-pass')
+        assert user.password_hash == legacy
+
+    def test_argon2_wrong_password(self):
+        user = _user(generate_password_hash('secret-pass'))
+        user.check_password('secret-pass')
+        assert not user.check_password('wrong-pass')
+
+
+class TestVerifyResetToken:
+    """Only an unexpired matching token verifies"""
+
+    def test_valid(self):
+        user = _user(password_reset_token='reset-abc',
+                     password_reset_expires=datetime.utcnow() + timedelta(hours=1))
+        assert user.verify_reset_token('reset-abc')
+
+    def test_wrong(self):
+        user = _user(password_reset_token='reset-abc',
+                     password_reset_expires=datetime.utcnow() + timedelta(hours=1))
+        assert not user.verify_reset_token('reset-abd')
+
+    def test_expired(self):
+        user = _user(password_reset_token='reset-abc',
+                     password_reset_expires=datetime.utcnow() - timedelta(seconds=1))
+        assert not user.verify_reset_token('reset-abc')
+
+    def test_missing_expiry(self):
+        user = _user(password_reset_token='reset-abc')
+        assert not user.verify_reset_token('reset-abc')
+
+    @pytest.mark.parametrize('stored, given', [(None, 'reset-abc'), ('reset-abc', ''), (None, '')])
+    def test_missing_token(self, stored, given):
+        user = _user(password_reset_token=stored,
+                     password_reset_expires=datetime.utcnow() + timedelta(hours=1))
+        assert not user.verify_reset_token(given)